@@ -21,7 +21,8 @@ class PostAdmin(admin.ModelAdmin):
         'pub_date',
         'author',
         'location',
-        'category'
+        'category',
+        'comment_count'
     )
     search_fields = ('title',)
     list_filter = ('category', 'location')
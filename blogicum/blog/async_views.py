@@ -0,0 +1,99 @@
+"""Асинхронные варианты страниц только для чтения (ASGI).
+
+Под ASGI синхронные представления Django выполняются по одному в общем
+потоке, поэтому медленный запрос к базе задерживает все остальные.
+`AsyncPageView` оборачивает обычное представление страницы: сначала
+одновременно, каждый в своём потоке и со своим соединением, выполняет
+независимые запросы страницы из `get_independent_queries()` (объект
+страницы, число записей для пагинатора, данные для условного GET,
+страница комментариев), а затем собирает ответ тем же синхронным кодом,
+что и WSGI, — результаты запросов он берёт из памяти.
+
+Потоковые ответы (`StreamingRenderMixin`) на этом пути не стримятся:
+ASGI-обработчик Django 3.2 перебирает `streaming_content` синхронно,
+прямо в цикле событий, где обращаться к базе нельзя, поэтому все куски
+рендерятся заранее в потоке, страница целиком собирается в памяти, и
+первый байт клиент получает только после её рендеринга.
+
+Включаются настройкой `BLOG_ASYNC_VIEWS` (см. `read_only_view`).
+Соединения потоков из пула живут, пока жив поток, и не закрываются
+по `CONN_MAX_AGE`.
+"""
+import asyncio
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404
+from django.views import View
+
+
+def in_thread(func, *args, **kwargs):
+    """Выполняет синхронную функцию в отдельном потоке из пула."""
+    return sync_to_async(func, thread_sensitive=False)(*args, **kwargs)
+
+
+class AsyncPageView(View):
+    """Асинхронная обёртка над представлением `page_view`.
+
+    Страница в кэше (см. `SharedPageCacheMixin`) отдаётся без
+    предварительных запросов.
+    """
+
+    page_view = None
+    http_method_names = ['get', 'head']
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        # Django 3.2 отличает асинхронные представления только по
+        # функции-корутине, а `View.as_view` всегда возвращает обычную.
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        return functools.update_wrapper(async_view, view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() not in self.http_method_names:
+            return self.http_method_not_allowed(request, *args, **kwargs)
+        return await self.get(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        page = self.page_view()
+        page.setup(request, *args, **kwargs)
+        queries = await in_thread(self.get_pending_queries, page)
+        await asyncio.gather(*(
+            in_thread(self.run_query, page, query) for query in queries))
+        response = await in_thread(page.dispatch, request, *args, **kwargs)
+        if response.streaming:
+            # ASGI-обработчик Django 3.2 читает потоковый ответ прямо в
+            # цикле событий, где к базе обращаться нельзя: куски
+            # рендерятся заранее, в потоке, и ответ уже не потоковый
+            # (см. описание модуля).
+            response.streaming_content = await in_thread(
+                list, response.streaming_content)
+        return response
+
+    @staticmethod
+    def get_pending_queries(page):
+        cached, _ = getattr(page, 'cached_page', (None, None))
+        if cached is not None:
+            return []
+        return page.get_independent_queries()
+
+    @staticmethod
+    def run_query(page, query):
+        with page.read_scope():
+            try:
+                query()
+            except Http404:
+                # Страница ответит 404 сама, в своём порядке проверок.
+                pass
+
+
+def read_only_view(view_class):
+    """Представление для адреса: асинхронное при `BLOG_ASYNC_VIEWS`."""
+    if settings.BLOG_ASYNC_VIEWS:
+        return AsyncPageView.as_view(page_view=view_class)
+    return view_class.as_view()
@@ -0,0 +1,165 @@
+"""Кэш целых страниц блога с инвалидацией по тегам.
+
+Каждая сохранённая страница помнит версии тегов, от которых зависит:
+`feed` — любая лента, `category:<slug>` — лента категории,
+`post:<id>` — страница поста, `catalog` — справочники категорий и
+местоположений, `sitemap:<раздел>:<часть>` — часть карты сайта,
+`sitemap` — состав индекса карты сайта. Сигналы моделей сбрасывают
+версии затронутых тегов, и при следующем чтении страница с устаревшей
+версией считается промахом. Так же, по тегу `post-count`, хранятся
+числа постов для пагинаторов лент (см. `cached_count`).
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from .utils import seconds_until_next_publication
+
+FEED_TAG = 'feed'
+CATALOG_TAG = 'catalog'
+SITEMAP_TAG = 'sitemap'
+COUNT_TAG = 'post-count'
+PAGE_KEY_PREFIX = 'blog:page:'
+TAG_KEY_PREFIX = 'blog:tag:'
+CARD_KEY_PREFIX = 'blog:card:'
+COUNT_KEY_PREFIX = 'blog:count:'
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+
+def get_page_cache():
+    return caches[settings.BLOG_PAGE_CACHE_ALIAS]
+
+
+def post_tag(post_id):
+    return f'post:{post_id}'
+
+
+def category_tag(category_slug):
+    return f'category:{category_slug}'
+
+
+def sitemap_tag(section, page):
+    return f'{SITEMAP_TAG}:{section}:{page}'
+
+
+def bump_tags(*tags):
+    """Сбрасывает версии тегов, делая зависящие от них страницы устаревшими."""
+    tags = {tag for tag in tags if tag}
+    if not tags:
+        return
+    get_page_cache().set_many(
+        {TAG_KEY_PREFIX + tag: uuid.uuid4().hex for tag in tags},
+        timeout=None,
+    )
+
+
+def post_card_key(post):
+    """Ключ карточки поста: id и версия `updated_at`.
+
+    `updated_at` меняется при правке поста, его категории,
+    местоположения, автора и комментариев (см. blog/signals.py), поэтому
+    инвалидировать карточки отдельно не нужно: устаревшие ключи просто
+    перестают читаться и истекают по таймауту.
+    """
+    return f'{CARD_KEY_PREFIX}{post.pk}:{post.updated_at.timestamp()}'
+
+
+def page_cache_key(request):
+    """Ключ страницы: схема, хост и путь с параметрами запроса.
+
+    Карта сайта и ленты содержат абсолютные адреса, построенные по
+    хосту и схеме запроса, поэтому одна и та же страница под разными
+    хостами или по http и https кэшируется отдельно.
+    """
+    url = request.build_absolute_uri(request.get_full_path())
+    return PAGE_KEY_PREFIX + hashlib.md5(url.encode()).hexdigest()
+
+
+def _get_with_versions(key, tags):
+    """Читает запись `key` и текущие версии тегов одним запросом к кэшу.
+
+    Тегам, которых ещё нет в кэше, назначаются новые версии.
+    """
+    cache = get_page_cache()
+    tag_keys = {TAG_KEY_PREFIX + tag: tag for tag in tags}
+    found = cache.get_many([key, *tag_keys])
+
+    missing = {
+        key: uuid.uuid4().hex for key in tag_keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    versions = {tag: found[key] for key, tag in tag_keys.items()}
+    return found.get(key), versions
+
+
+def get_cached_page(request, tags):
+    """Ищет страницу в кэше и снимает текущие версии её тегов.
+
+    Возвращает пару `(ответ или None, версии)`. Версии нужно передать в
+    `store_page`: они сняты до рендеринга, поэтому запись, случившаяся
+    во время рендеринга, не «узаконит» устаревшую страницу.
+    """
+    entry, versions = _get_with_versions(page_cache_key(request), tags)
+    if entry is None or entry['tags'] != versions:
+        return None, versions
+    response = HttpResponse(
+        entry['content'], content_type=entry['content_type'])
+    for header, value in entry.get('validators', {}).items():
+        response[header] = value
+    response['X-Page-Cache'] = 'hit'
+    return response, versions
+
+
+def store_page(request, response, versions, timeout=None):
+    """Сохраняет отрендеренный ответ вместе с версиями его тегов.
+
+    По умолчанию страница хранится `BLOG_PAGE_CACHE_TIMEOUT` секунд, но
+    не дольше, чем до появления ближайшей отложенной публикации: это
+    событие не сбрасывает версии тегов.
+    """
+    timeout = timeout or settings.BLOG_PAGE_CACHE_TIMEOUT
+    pending = seconds_until_next_publication()
+    if pending is not None:
+        timeout = min(timeout, pending)
+    get_page_cache().set(
+        page_cache_key(request),
+        {
+            'content': response.content,
+            'content_type': response['Content-Type'],
+            'validators': {
+                header: response[header]
+                for header in VALIDATOR_HEADERS if response.has_header(header)
+            },
+            'tags': versions,
+        },
+        timeout=timeout,
+    )
+
+
+def cached_count(key, count, limit=0):
+    """Число записей списка `key`, посчитанное `count()` или из кэша.
+
+    Точное число действует до смены версии тега `post-count` (её
+    сбрасывают правки постов и категорий) и не дольше
+    `BLOG_PAGINATOR_COUNT_TIMEOUT` секунд: посты, отложенные в будущее,
+    появляются в списках без всяких правок. Число больше `limit` —
+    лишь оценка «записей больше порога», и одна правка её не меняет,
+    поэтому она живёт до таймаута. Таймаут 0 отключает кэш.
+    """
+    timeout = settings.BLOG_PAGINATOR_COUNT_TIMEOUT
+    if not timeout:
+        return count()
+    cache_key = COUNT_KEY_PREFIX + hashlib.md5(key.encode()).hexdigest()
+    entry, versions = _get_with_versions(cache_key, [COUNT_TAG])
+    if entry is not None and (
+            entry['tags'] == versions
+            or limit and entry['count'] > limit):
+        return entry['count']
+    value = count()
+    get_page_cache().set(
+        cache_key, {'count': value, 'tags': versions}, timeout=timeout)
+    return value
@@ -1,2 +1,5 @@
 MAX_LENGTH = 256
 PAGINATION_SIZE = 10
+COMMENTS_PAGINATION_SIZE = 50
+PAGINATOR_ON_EACH_SIDE = 2
+PAGINATOR_ON_ENDS = 1
@@ -0,0 +1,289 @@
+"""RSS- и Atom-ленты публикаций.
+
+Ленты строятся на `django.contrib.syndication`, но XML отдаётся потоком:
+посты читаются из базы итератором и выводятся по одному, не собирая
+весь документ в памяти. Готовый документ попутно сохраняется в кэш
+страниц (`blog.cache`) с теми же тегами, что и HTML-страницы, поэтому
+повторные опросы читалок до изменения постов не трогают базу.
+
+Ленты одинаковы для всех посетителей, так что кэшируются и для
+авторизованных. Ссылки в ленте абсолютные, по хосту и схеме запроса,
+поэтому и кэш страниц, и ETag различают хосты. Условный GET
+поддерживается по ETag: он строится из хоста и `(id, pub_date,
+updated_at)` постов ленты, поэтому меняется и при правке поста, и при
+его удалении или снятии с публикации. При промахе кэша эти пары
+читаются одним запросом — без чтения самих постов. Last-Modified лента
+не отдаёт: после удаления последнего поста он не растёт, и читалка
+получала бы 304 со снятой записью.
+"""
+from hashlib import md5
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sites.shortcuts import get_current_site
+from django.contrib.syndication.views import Feed, add_domain
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import (Atom1Feed, Rss201rev2Feed,
+                                        SimplerXMLGenerator)
+
+from .cache import (CATALOG_TAG, FEED_TAG, category_tag, get_cached_page,
+                    store_page)
+from .models import Category, Post
+from .views import get_filtered_posts
+
+User = get_user_model()
+
+
+def _drain(buffer):
+    chunk = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return chunk
+
+
+class StreamingFeedMixin:
+    """Генератор ленты, который пишет XML по одному элементу.
+
+    Элементы берутся не из `self.items`, а из переданного итератора;
+    дату последнего изменения ленты задаёт `latest_date`, потому что
+    заранее перебрать все элементы нельзя.
+    """
+
+    root_element = None
+    item_element = None
+    latest_date = None
+
+    def latest_post_date(self):
+        return self.latest_date or super().latest_post_date()
+
+    def open_root(self, handler):
+        handler.startElement(self.root_element, self.root_attributes())
+
+    def close_root(self, handler):
+        handler.endElement(self.root_element)
+
+    def stream(self, items, encoding):
+        buffer = StringIO()
+        handler = SimplerXMLGenerator(
+            buffer, encoding, short_empty_elements=True)
+        handler.startDocument()
+        self.open_root(handler)
+        self.add_root_elements(handler)
+        yield _drain(buffer)
+        for item in items:
+            handler.startElement(
+                self.item_element, self.item_attributes(item))
+            self.add_item_elements(handler, item)
+            handler.endElement(self.item_element)
+            yield _drain(buffer)
+        self.close_root(handler)
+        yield _drain(buffer)
+
+
+class StreamingRssFeed(StreamingFeedMixin, Rss201rev2Feed):
+    item_element = 'item'
+
+    def open_root(self, handler):
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+
+    def close_root(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+class StreamingAtomFeed(StreamingFeedMixin, Atom1Feed):
+    root_element = 'feed'
+    item_element = 'entry'
+
+
+class PostFeed(Feed):
+    """Общая часть лент: выбор постов, кэш, поток и условный GET.
+
+    Наследники сужают `get_posts(obj)` и `get_cache_tags(obj)`.
+    `items()` возвращает пустой список: стандартный `get_feed()` строит
+    только заголовок ленты, а посты выводятся потоком в `__call__`.
+    """
+
+    feed_type = StreamingRssFeed
+
+    def get_posts(self, obj):
+        return Post.objects.all()
+
+    def get_cache_tags(self, obj):
+        return [FEED_TAG]
+
+    def get_feed_posts(self, obj):
+        return get_filtered_posts(self.get_posts(obj)).order_by(
+            '-pub_date', '-id')[:settings.BLOG_FEED_SIZE]
+
+    def items(self, obj):
+        return []
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', kwargs={'id': item.pk})
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_author_name(self, item):
+        return item.author.get_username()
+
+    def item_author_link(self, item):
+        return reverse('blog:profile', kwargs={
+            'username': item.author.get_username()})
+
+    def item_categories(self, item):
+        return [item.category.title] if item.category else []
+
+    def stream_items(self, posts, feed, request):
+        """Словари элементов ленты, по одному на пост из итератора."""
+        site = get_current_site(request)
+        for post in posts.iterator(chunk_size=settings.BLOG_FEED_SIZE):
+            link = add_domain(
+                site.domain, self.item_link(post), request.is_secure())
+            feed.add_item(
+                title=self.item_title(post),
+                link=link,
+                description=self.item_description(post),
+                unique_id=link,
+                pubdate=self.item_pubdate(post),
+                updateddate=self.item_updateddate(post),
+                author_name=self.item_author_name(post),
+                author_link=add_domain(
+                    site.domain, self.item_author_link(post),
+                    request.is_secure()),
+                categories=self.item_categories(post),
+            )
+            yield feed.items.pop()
+
+    def __call__(self, request, *args, **kwargs):
+        try:
+            obj = self.get_object(request, *args, **kwargs)
+        except ObjectDoesNotExist:
+            raise Http404('Feed object does not exist.')
+
+        use_cache = bool(settings.BLOG_PAGE_CACHE_TIMEOUT)
+        versions = None
+        if use_cache:
+            cached, versions = get_cached_page(
+                request, self.get_cache_tags(obj))
+            if cached is not None:
+                return get_conditional_response(
+                    request, etag=cached['ETag'], response=cached)
+
+        posts = self.get_feed_posts(obj)
+        rows = list(posts.values_list('pk', 'pub_date', 'updated_at'))
+        # Ссылки в ленте абсолютные, поэтому документ зависит и от хоста
+        # со схемой запроса.
+        fingerprint = repr((request.build_absolute_uri('/'), rows))
+        etag = f'"{md5(fingerprint.encode()).hexdigest()}"'
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        feed = self.get_feed(obj, request)
+        feed.latest_date = max(
+            (max(pub_date, updated_at) for _, pub_date, updated_at in rows),
+            default=None)
+        chunks = feed.stream(
+            self.stream_items(posts, feed, request), 'utf-8')
+        if use_cache:
+            chunks = self._recording(
+                chunks, request, feed.content_type, etag, versions)
+        response = StreamingHttpResponse(
+            chunks, content_type=feed.content_type)
+        response['ETag'] = etag
+        return response
+
+    @staticmethod
+    def _recording(chunks, request, content_type, etag, versions):
+        """Отдаёт куски XML дальше и кэширует документ целиком."""
+        written = []
+        for chunk in chunks:
+            written.append(chunk)
+            yield chunk
+        response = HttpResponse(''.join(written), content_type=content_type)
+        response['ETag'] = etag
+        store_page(request, response, versions)
+
+
+class IndexFeed(PostFeed):
+    title = 'Блогикум — лента записей'
+    description = 'Новые публикации всех авторов.'
+
+    def link(self):
+        return reverse('blog:index')
+
+
+class CategoryFeed(PostFeed):
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True)
+
+    def title(self, obj):
+        return f'Блогикум — {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('blog:category_posts', kwargs={
+            'category_slug': obj.slug})
+
+    def get_posts(self, obj):
+        return Post.objects.filter(category=obj)
+
+    def get_cache_tags(self, obj):
+        return [category_tag(obj.slug), CATALOG_TAG]
+
+
+class ProfileFeed(PostFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Блогикум — публикации {obj.get_username()}'
+
+    def description(self, obj):
+        return f'Новые публикации пользователя {obj.get_username()}.'
+
+    def link(self, obj):
+        return reverse('blog:profile', kwargs={
+            'username': obj.get_username()})
+
+    def get_posts(self, obj):
+        return Post.objects.filter(author=obj)
+
+
+class IndexAtomFeed(IndexFeed):
+    feed_type = StreamingAtomFeed
+    subtitle = IndexFeed.description
+
+
+class CategoryAtomFeed(CategoryFeed):
+    feed_type = StreamingAtomFeed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+class ProfileAtomFeed(ProfileFeed):
+    feed_type = StreamingAtomFeed
+
+    def subtitle(self, obj):
+        return self.description(obj)
@@ -0,0 +1,68 @@
+"""Персональные части страниц из общего кэша («дыры»).
+
+Страница, которую кэш отдаёт всем посетителям, рендерится с метками
+вместо частей, зависящих от посетителя: шапки с его именем, кнопок
+правки своих постов и комментариев, формы комментария с CSRF-токеном.
+Перед отдачей ответа `fill_holes` заменяет каждую метку шаблоном,
+отрендеренным для текущего запроса.
+
+Метка — HTML-комментарий с именем шаблона и его параметрами в JSON.
+Пользовательский текст на страницах экранируется, поэтому подделать
+метку из содержимого поста или комментария нельзя.
+"""
+import json
+import re
+
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+HOLE_RE = re.compile(r'<!--blog:hole (\{.*?\})-->')
+
+
+def hole_marker(template_name, params):
+    payload = json.dumps(
+        {'template': template_name, 'params': params},
+        ensure_ascii=False, sort_keys=True,
+    ).replace('<', '\\u003c').replace('>', '\\u003e')
+    return mark_safe(f'<!--blog:hole {payload}-->')
+
+
+def render_holes(content, request, context=None):
+    """Заменяет метки в тексте `content` частями для посетителя `request`.
+
+    Шаблон каждой дыры получает `context`, свои параметры и данные
+    контекст-процессоров (`user`, `request`, `csrf_token`). Одинаковые
+    дыры рендерятся один раз.
+    """
+    context = context or {}
+    rendered = {}
+
+    def render(match):
+        payload = match.group(1)
+        if payload not in rendered:
+            hole = json.loads(payload)
+            rendered[payload] = render_to_string(
+                hole['template'], {**context, **hole['params']},
+                request=request)
+        return rendered[payload]
+
+    return HOLE_RE.sub(render, content)
+
+
+def fill_holes(response, request, context=None):
+    """Заполняет метки в теле ответа для посетителя `request`.
+
+    У потокового ответа метки заполняются в каждом куске по мере отдачи.
+    """
+    if response.streaming:
+        chunks = response.streaming_content
+        response.streaming_content = (
+            render_holes(
+                chunk.decode(response.charset), request, context
+            ).encode(response.charset)
+            for chunk in chunks
+        )
+        return response
+    content = response.content.decode(response.charset)
+    response.content = render_holes(content, request, context)
+    return response
@@ -0,0 +1,117 @@
+"""Общие помощники для команд-бенчмарков `bench_*`.
+
+Бенчмарки работают на тестовой базе, которую создают сами, и никогда
+не трогают рабочие данные.
+"""
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from blog.models import Category, Comment, Location, Post
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+from django.utils import timezone
+
+User = get_user_model()
+
+SEED_BATCH_SIZE = 10_000
+
+
+@contextmanager
+def benchmark_database(keepdb=False, test_name=None):
+    """Создаёт тестовую базу и удаляет её после.
+
+    SQLite по умолчанию создаёт базу в памяти; `test_name` задаёт файл,
+    если нужно мерить работу с диском или несколько соединений.
+    """
+    test_settings = connection.settings_dict['TEST']
+    old_test_name = test_settings.get('NAME')
+    if test_name is not None:
+        test_settings['NAME'] = str(test_name)
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(
+            old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+        test_settings['NAME'] = old_test_name
+
+
+def seed(posts, comments=0, users=100, categories=20, locations=10,
+         stdout=None):
+    """Наполняет базу публикациями с реалистичным распределением.
+
+    Примерно каждая десятая категория и каждый двадцатый пост сняты с
+    публикации, а около процента постов отложены в будущее.
+    """
+    rng = random.Random(0)
+    now = timezone.now()
+    User.objects.bulk_create(
+        User(username=f'bench_user_{i}') for i in range(users))
+    Category.objects.bulk_create(
+        Category(title=f'Категория {i}', description='', slug=f'bench-{i}',
+                 is_published=i % 10 != 9)
+        for i in range(categories))
+    Location.objects.bulk_create(
+        Location(name=f'Место {i}') for i in range(locations))
+    user_ids = list(User.objects.values_list('pk', flat=True))
+    category_ids = list(Category.objects.values_list('pk', flat=True))
+    location_ids = list(Location.objects.values_list('pk', flat=True))
+
+    def make_post(i):
+        if rng.random() < 0.01:
+            pub_date = now + timedelta(minutes=rng.randint(1, 60 * 24 * 30))
+        else:
+            pub_date = now - timedelta(
+                minutes=rng.randint(0, 60 * 24 * 365 * 5))
+        return Post(
+            title=f'Публикация {i}',
+            text='Текст публикации. ' * 8,
+            pub_date=pub_date,
+            author_id=rng.choice(user_ids),
+            category_id=rng.choice(category_ids),
+            location_id=rng.choice(location_ids),
+            is_published=rng.random() >= 0.05,
+        )
+
+    for start in range(0, posts, SEED_BATCH_SIZE):
+        stop = min(start + SEED_BATCH_SIZE, posts)
+        Post.objects.bulk_create(make_post(i) for i in range(start, stop))
+        if stdout is not None:
+            stdout.write(f'  посты: {stop}/{posts}')
+
+    if comments:
+        max_post_id = Post.objects.order_by('-pk').values_list(
+            'pk', flat=True).first()
+        for start in range(0, comments, SEED_BATCH_SIZE):
+            stop = min(start + SEED_BATCH_SIZE, comments)
+            Comment.objects.bulk_create(
+                Comment(
+                    post_id=rng.randint(1, max_post_id),
+                    author_id=rng.choice(user_ids),
+                    text='Комментарий',
+                )
+                for _ in range(start, stop)
+            )
+        Post.objects.recount_comments()
+
+
+def measure(func, repeat=20, warmup=2):
+    """Возвращает медиану и 95-й перцентиль времени вызова в миллисекундах."""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return statistics.median(timings), p95
@@ -0,0 +1,182 @@
+import asyncio
+import importlib
+import random
+import threading
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from blog.models import Category, Post
+from blog.views import get_filtered_posts
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import clear_url_caches
+
+from ._bench import benchmark_database, seed
+
+User = get_user_model()
+
+
+def reload_urls():
+    """Перечитывает адреса после смены `BLOG_ASYNC_VIEWS`."""
+    clear_url_caches()
+    for module in ('blog.urls', settings.ROOT_URLCONF):
+        importlib.reload(importlib.import_module(module))
+
+
+def percentile(timings, share):
+    return timings[min(len(timings) - 1, int(len(timings) * share))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест страниц только для чтения: WSGI с синхронными '
+        'представлениями против ASGI с синхронными и с асинхронными '
+        '(BLOG_ASYNC_VIEWS). Запросы идут через обработчики Django в '
+        'процессе: WSGI — из потоков, ASGI — из задач одного цикла '
+        'событий. Кэш страниц выключен, чтобы мерить сами представления.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=20_000)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--concurrency', type=int, default=8)
+
+    def handle(self, *args, posts, **options):
+        results = {}
+        with TemporaryDirectory() as directory, \
+                override_settings(DEBUG=False, BLOG_PAGE_CACHE_TIMEOUT=0), \
+                benchmark_database(
+                    test_name=Path(directory) / 'bench.sqlite3'):
+            self.stdout.write(f'Наполняем базу: {posts} публикаций...')
+            seed(posts, comments=posts * 2)
+            self.urls = self.make_urls()
+            self.users = list(User.objects.all()[:options['concurrency']])
+            modes = (
+                ('wsgi', False, self.run_wsgi),
+                ('asgi', False, self.run_asgi),
+                ('asgi+async', True, self.run_asgi),
+            )
+            try:
+                for name, async_views, run in modes:
+                    with override_settings(BLOG_ASYNC_VIEWS=async_views):
+                        reload_urls()
+                        results[name] = self.report(name, run(**options))
+            finally:
+                reload_urls()
+                connections.close_all()
+
+        self.stdout.write(
+            '\nИтог (запросов/с, медиана / p95 / p99 мс):')
+        for name, (rate, p50, p95, p99) in results.items():
+            self.stdout.write(
+                f'  {name:<11} {rate:>7.0f}   '
+                f'{p50:>7.1f} / {p95:>7.1f} / {p99:>7.1f}')
+
+    def make_urls(self):
+        posts = list(
+            get_filtered_posts(Post.objects.all())
+            .values_list('pk', 'author__username')[:200])
+        slugs = list(
+            Category.objects.filter(is_published=True)
+            .values_list('slug', flat=True))
+        if not posts or not slugs:
+            raise CommandError('В базе нет опубликованных постов.')
+        rng = random.Random(0)
+        urls = []
+        for _ in range(500):
+            pk, username = rng.choice(posts)
+            urls += [
+                f'/?page={rng.randint(1, 20)}',
+                f'/category/{rng.choice(slugs)}/',
+                f'/profile/{username}/',
+                f'/posts/{pk}/',
+            ]
+        rng.shuffle(urls)
+        return urls
+
+    def report(self, name, timings):
+        timings, seconds, errors = timings
+        timings.sort()
+        if not timings:
+            raise CommandError(f'{name}: ни один запрос не выполнен.')
+        row = (
+            len(timings) / seconds,
+            percentile(timings, 0.5),
+            percentile(timings, 0.95),
+            percentile(timings, 0.99),
+        )
+        self.stdout.write(
+            f'{name}: {row[0]:.0f} запросов/с, медиана {row[1]:.1f} мс, '
+            f'p95 {row[2]:.1f} мс, p99 {row[3]:.1f} мс, ошибок: {errors}')
+        return row
+
+    def run_wsgi(self, seconds, concurrency, **options):
+        stop = threading.Event()
+        timings = []
+        errors = []
+
+        def worker(number):
+            client = Client()
+            client.force_login(self.users[number % len(self.users)])
+            urls = self.urls[number::concurrency]
+            try:
+                for url in self.cycle(urls, stop.is_set):
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    if response.status_code != 200:
+                        errors.append(url)
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=worker, args=(number,))
+            for number in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return timings, seconds, len(errors)
+
+    def run_asgi(self, seconds, concurrency, **options):
+        timings = []
+        errors = []
+        clients = []
+        for number in range(concurrency):
+            client = AsyncClient()
+            client.force_login(self.users[number % len(self.users)])
+            clients.append(client)
+
+        async def worker(number, deadline):
+            urls = self.urls[number::concurrency]
+            for url in self.cycle(
+                    urls, lambda: time.perf_counter() > deadline):
+                started = time.perf_counter()
+                response = await clients[number].get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    errors.append(url)
+
+        async def main():
+            deadline = time.perf_counter() + seconds
+            await asyncio.gather(*(
+                worker(number, deadline) for number in range(concurrency)))
+
+        asyncio.run(main())
+        connections.close_all()
+        return timings, seconds, len(errors)
+
+    @staticmethod
+    def cycle(urls, stopped):
+        while True:
+            for url in urls:
+                if stopped():
+                    return
+                yield url
@@ -0,0 +1,80 @@
+from blog.models import Comment, Post
+from blog.utils import published_now
+from blog.views import get_filtered_posts
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from ._bench import benchmark_database, measure, seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает планы и время запросов лент без составных индексов '
+        'и с ними на тестовой базе с заданным числом публикаций.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--comments', type=int, default=200_000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, posts, comments, repeat, **options):
+        with benchmark_database():
+            self.stdout.write(f'Наполняем базу: {posts} публикаций...')
+            seed(posts, comments=comments, stdout=self.stdout)
+            queries = self.build_queries()
+
+            indexes = Post._meta.indexes + Comment._meta.indexes
+            self.drop_indexes(indexes)
+            before = self.run(queries, repeat, 'без индексов')
+            self.create_indexes(indexes)
+            after = self.run(queries, repeat, 'с индексами')
+
+        self.stdout.write('\nИтог, медиана мс (без → с индексами):')
+        for name in queries:
+            self.stdout.write(
+                f'  {name:<18} {before[name]:>9.2f} → {after[name]:>7.2f}')
+
+    def build_queries(self):
+        post = Post.objects.filter(comment_count__gt=0).first()
+        category_id = post.category_id
+        author_id = post.author_id
+        now = published_now()
+        return {
+            'главная': get_filtered_posts(Post.objects.all()).order_by(
+                '-pub_date', '-id'),
+            'категория': Post.objects.select_related(
+                'author', 'category', 'location').filter(
+                category_id=category_id, is_published=True,
+                pub_date__lte=now).order_by('-pub_date', '-id'),
+            'профиль': Post.objects.filter(author_id=author_id).order_by(
+                '-pub_date', '-id'),
+            'комментарии': Comment.objects.filter(
+                post_id=post.pk, is_published=True).order_by('created_at'),
+        }
+
+    def run(self, queries, repeat, title):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {title} =='))
+        medians = {}
+        for name, queryset in queries.items():
+            page = queryset[:10]
+            median, p95 = measure(lambda: list(page.all()), repeat=repeat)
+            medians[name] = median
+            self.stdout.write(
+                f'{name}: медиана {median:.2f} мс, p95 {p95:.2f} мс')
+            self.stdout.write(f'  план: {page.explain()}')
+        return medians
+
+    def drop_indexes(self, indexes):
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                model = Post if index in Post._meta.indexes else Comment
+                editor.remove_index(model, index)
+
+    def create_indexes(self, indexes):
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                model = Post if index in Post._meta.indexes else Comment
+                editor.add_index(model, index)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
@@ -0,0 +1,83 @@
+from blog.models import Post
+from blog.pagination import CountLimitedPaginator, count_up_to
+from blog.views import get_filtered_posts
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.test import Client, override_settings
+
+from ._bench import benchmark_database, measure, seed
+
+# Прежний пагинатор: ссылка на каждую страницу.
+FULL_RANGE_TEMPLATE = '''
+{% for i in page_obj.paginator.page_range %}
+  <li class="page-item">
+    <a class="page-link" href="?page={{ i }}">{{ i }}</a>
+  </li>
+{% endfor %}
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пагинатор со ссылкой на каждую страницу и точным '
+        'COUNT(*) с окном страниц и счётом до BLOG_PAGINATOR_COUNT_LIMIT, '
+        'а ленту без кэша числа постов — с ним.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, posts, repeat, **options):
+        limit = settings.BLOG_PAGINATOR_COUNT_LIMIT
+        with override_settings(DEBUG=False, BLOG_PAGE_CACHE_TIMEOUT=0), \
+                benchmark_database():
+            self.stdout.write(f'Наполняем базу: {posts} публикаций...')
+            seed(posts, stdout=self.stdout)
+            queryset = get_filtered_posts(Post.objects.all())
+            rows = {
+                'COUNT(*)': (
+                    measure(queryset.count, repeat=repeat),
+                    measure(lambda: count_up_to(queryset, limit),
+                            repeat=repeat),
+                ),
+                'пагинатор': self.render_paginator(queryset, limit, repeat),
+                'лента ?page=5': (
+                    self.fetch_page(
+                        repeat, BLOG_PAGINATOR_COUNT_LIMIT=0,
+                        BLOG_PAGINATOR_COUNT_TIMEOUT=0),
+                    self.fetch_page(repeat, BLOG_PAGINATOR_COUNT_TIMEOUT=0),
+                ),
+                'кэш числа': (
+                    self.fetch_page(repeat, BLOG_PAGINATOR_COUNT_TIMEOUT=0),
+                    self.fetch_page(repeat),
+                ),
+            }
+
+        self.stdout.write(
+            f'\nИтог, медиана мс (точно → до {limit}, окно страниц, '
+            'кэш числа):')
+        for name, ((before, _), (after, _)) in rows.items():
+            self.stdout.write(f'  {name:<14} {before:>8.2f} → {after:>7.2f}')
+
+    def render_paginator(self, queryset, limit, repeat):
+        engine = engines['django']
+        full = engine.from_string(FULL_RANGE_TEMPLATE)
+        window = engine.get_template('includes/paginator.html')
+        page = CountLimitedPaginator(queryset, 10).page(5)
+        elided = CountLimitedPaginator(queryset, 10, count_limit=limit).page(5)
+        size = len(full.render({'page_obj': page}))
+        self.stdout.write(
+            f'пагинатор: {page.paginator.num_pages} ссылок, {size} байт → '
+            f'{len(window.render({"page_obj": elided}))} байт')
+        return (
+            measure(lambda: full.render({'page_obj': page}), repeat=repeat),
+            measure(lambda: window.render({'page_obj': elided}),
+                    repeat=repeat),
+        )
+
+    def fetch_page(self, repeat, **overrides):
+        client = Client()
+        with override_settings(**overrides):
+            return measure(lambda: client.get('/?page=5'), repeat=repeat)
@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from tempfile import TemporaryDirectory
+
+from blog.models import Category, Post
+from blog.views import get_filtered_posts
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from ._bench import benchmark_database, measure, seed
+
+User = get_user_model()
+
+# Запуск процесса сервера: настройки, приложения, промежуточные слои и
+# адреса — всё, что делает WSGI-сервер до первого запроса.
+STARTUP_SCRIPT = (
+    'from blogicum.wsgi import application; '
+    'from django.urls import resolve; resolve("/")'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает профили настроек BLOGICUM_PROFILE (dev, test, prod): '
+        'время запуска процесса сервера и время ответа страниц. Каждый '
+        'профиль мерится в отдельном процессе; страницы — с настройками '
+        'профиля как есть (в dev — с DEBUG и debug_toolbar), но без кэша '
+        'страниц.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--starts', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=50)
+        # Замер страниц внутри процесса одного профиля.
+        parser.add_argument(
+            '--pages-only', action='store_true', help=argparse.SUPPRESS)
+
+    def handle(self, *args, posts, starts, repeat, pages_only, **options):
+        if pages_only:
+            self.stdout.write(json.dumps(self.measure_pages(posts, repeat)))
+            return
+        results = {}
+        with TemporaryDirectory() as static_root, \
+                TemporaryDirectory() as cache_dir:
+            # prod требует общего для процессов кэша; чтобы сравнение было
+            # честным, его получают все профили.
+            env = {
+                'BLOGICUM_CACHE_BACKEND': (
+                    'django.core.cache.backends.filebased.FileBasedCache'),
+                'BLOGICUM_CACHE_LOCATION': cache_dir,
+                **os.environ,
+                'BLOGICUM_STATIC_ROOT': static_root,
+                'BLOGICUM_SECRET_KEY': os.environ.get(
+                    'BLOGICUM_SECRET_KEY', 'bench'),
+            }
+            # ManifestStaticFilesStorage без манифеста не отдаёт адреса.
+            self.run_manage(
+                'prod', env, 'collectstatic', '--noinput', '--verbosity=0')
+            for profile in settings.PROFILES:
+                self.stdout.write(f'Профиль {profile}...')
+                startup = self.measure_startup(profile, env, starts)
+                output = self.run_manage(
+                    profile, env, 'bench_profiles', '--pages-only',
+                    f'--posts={posts}', f'--repeat={repeat}')
+                pages = json.loads(output.splitlines()[-1])
+                results[profile] = startup, pages
+
+        names = list(results['dev'][1])
+        self.stdout.write(
+            '\nИтог, медиана мс (запуск процесса, затем страницы):')
+        self.stdout.write(f'  {"":<10}' + ''.join(
+            f'{profile:>10}' for profile in settings.PROFILES))
+        rows = [('запуск', {
+            profile: startup for profile, (startup, _) in results.items()})]
+        rows += [(name, {
+            profile: pages[name][0]
+            for profile, (_, pages) in results.items()}) for name in names]
+        for name, row in rows:
+            self.stdout.write(f'  {name:<10}' + ''.join(
+                f'{row[profile]:>10.2f}' for profile in settings.PROFILES))
+
+    def run_manage(self, profile, env, *args):
+        completed = subprocess.run(
+            [sys.executable, str(settings.BASE_DIR / 'manage.py'), *args],
+            env={**env, 'BLOGICUM_PROFILE': profile},
+            cwd=settings.BASE_DIR, capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError(
+                f'{profile}: manage.py {args[0]} завершилась с ошибкой:\n'
+                f'{completed.stderr}')
+        return completed.stdout
+
+    def measure_startup(self, profile, env, starts):
+        timings = []
+        for _ in range(starts):
+            started = time.perf_counter()
+            subprocess.run(
+                [sys.executable, '-c', STARTUP_SCRIPT],
+                env={**env, 'BLOGICUM_PROFILE': profile},
+                cwd=settings.BASE_DIR, check=True)
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def measure_pages(self, posts, repeat):
+        with override_settings(BLOG_PAGE_CACHE_TIMEOUT=0), \
+                benchmark_database():
+            seed(posts, comments=posts * 2)
+            post = get_filtered_posts(Post.objects.all()).order_by(
+                '-comment_count').first()
+            slug = Category.objects.filter(
+                is_published=True).values_list('slug', flat=True).first()
+            urls = {
+                'лента': '/?page=5',
+                'категория': f'/category/{slug}/',
+                'пост': f'/posts/{post.pk}/',
+            }
+            client = Client()
+            client.force_login(User.objects.first())
+            results = {}
+            for name, url in urls.items():
+                if client.get(url).status_code != 200:
+                    raise CommandError(f'{url} ответила не кодом 200.')
+                results[name] = measure(
+                    lambda: client.get(url), repeat=repeat)
+        return results
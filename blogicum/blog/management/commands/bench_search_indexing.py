@@ -0,0 +1,113 @@
+import json
+import time
+from itertools import cycle, islice
+from pathlib import Path
+
+from blog.models import Category, Post
+from blog.search import BACKENDS, WORD_RE, fts5_available, tokenize
+from blog.stemming import normalize, stem
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ._bench import SEED_BATCH_SIZE, benchmark_database
+
+User = get_user_model()
+
+
+def _tokenize_without_stemming(text):
+    return WORD_RE.findall(normalize(text))
+
+
+def _tokenize_without_cache(text):
+    return [
+        stem.__wrapped__(word) for word in _tokenize_without_stemming(text)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет скорость токенизации и индексации публикаций на '
+        'корпусе из фикстуры db.json, размноженном до заданного объёма.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--fixture', default=str(Path(settings.BASE_DIR) / 'db.json'),
+            help='JSON-фикстура, из которой берутся тексты постов.')
+
+    def handle(self, *args, posts, batch_size, fixture, **options):
+        corpus = [
+            (record['fields']['title'], record['fields']['text'])
+            for record in json.loads(Path(fixture).read_text('utf-8'))
+            if record['model'] == 'blog.post'
+        ]
+        if not corpus:
+            raise CommandError(f'В {fixture} нет публикаций.')
+        texts = list(islice(cycle(corpus), posts))
+        words = sum(
+            len(WORD_RE.findall(title + ' ' + text))
+            for title, text in corpus) * posts // len(corpus)
+        self.stdout.write(
+            f'Корпус: {len(corpus)} постов из {fixture}, размножен до '
+            f'{posts} постов, ~{words} слов.')
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\n== Токенизация =='))
+        self.time_tokenizer('без стемминга', _tokenize_without_stemming,
+                            texts, words)
+        self.time_tokenizer('стемминг без кэша', _tokenize_without_cache,
+                            texts, words)
+        stem.cache_clear()
+        self.time_tokenizer('стемминг, пустой кэш', tokenize, texts, words)
+        self.time_tokenizer('стемминг, тёплый кэш', tokenize, texts, words)
+        info = stem.cache_info()
+        self.stdout.write(
+            f'  кэш основ: {info.currsize} слов, '
+            f'попаданий {info.hits / (info.hits + info.misses):.1%}')
+
+        self.stdout.write(self.style.MIGRATE_HEADING('\n== Индексация =='))
+        with benchmark_database():
+            self.create_posts(texts)
+            for name, backend_class in BACKENDS.items():
+                if name == 'fts5' and not fts5_available():
+                    continue
+                self.time_indexing(name, backend_class(), batch_size, posts)
+
+    def time_tokenizer(self, title, func, texts, words):
+        started = time.perf_counter()
+        for post_title, text in texts:
+            func(post_title)
+            func(text)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{title}: {elapsed:.2f} с, {len(texts) / elapsed:,.0f} постов/с, '
+            f'{words / elapsed:,.0f} слов/с')
+
+    def create_posts(self, texts):
+        author = User.objects.create(username='bench_author')
+        category = Category.objects.create(
+            title='Категория', description='', slug='bench')
+        for start in range(0, len(texts), SEED_BATCH_SIZE):
+            Post.objects.bulk_create(
+                Post(title=title[:256], text=text, author=author,
+                     category=category)
+                for title, text in texts[start:start + SEED_BATCH_SIZE])
+
+    def time_indexing(self, name, backend, batch_size, total):
+        backend.clear()
+        started = time.perf_counter()
+        last_pk = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk')
+                .only('pk', 'title', 'text')[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            with transaction.atomic():
+                backend.index(batch)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{name}: {elapsed:.2f} с, {total / elapsed:,.0f} постов/с')
@@ -0,0 +1,82 @@
+from importlib import import_module
+
+from blog.models import Post
+from blog.views import get_filtered_posts
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ._bench import benchmark_database, measure, seed
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает хранилища сессий (SESSION_ENGINES): время чтения и '
+        'записи сессии и ответа страницы поста авторизованному '
+        'пользователю.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, posts, repeat, **options):
+        # Как и тесты, без DEBUG: иначе время съест debug_toolbar.
+        with override_settings(DEBUG=False), benchmark_database():
+            seed(posts, comments=posts)
+            user = User.objects.first()
+            post = get_filtered_posts(Post.objects.all()).order_by(
+                '-comment_count').first()
+            url = f'/posts/{post.pk}/'
+            results = {}
+            for store, engine in settings.SESSION_ENGINES.items():
+                with override_settings(SESSION_ENGINE=engine):
+                    results[store] = self.run(store, user, url, repeat)
+
+        self.stdout.write('\nИтог, медиана мс (чтение / запись / страница):')
+        for store, (read, write, page) in results.items():
+            self.stdout.write(
+                f'  {store:<15} {read:>7.3f} / {write:>7.3f} / {page:>7.2f}')
+
+    def run(self, store, user, url, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {store} =='))
+        for cache in caches.all():
+            cache.clear()
+        engine = import_module(settings.SESSION_ENGINE)
+
+        session = engine.SessionStore()
+        session['counter'] = 0
+        session.save()
+        key = session.session_key
+
+        def write():
+            session['counter'] += 1
+            session.save()
+
+        read, read_p95 = measure(
+            lambda: engine.SessionStore(key).load(), repeat=repeat)
+        written, write_p95 = measure(write, repeat=repeat)
+        self.stdout.write(
+            f'сессия: чтение {read:.3f} мс (p95 {read_p95:.3f}), '
+            f'запись {written:.3f} мс (p95 {write_p95:.3f})')
+
+        client = Client()
+        client.force_login(user)
+        client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        queries = len(ctx.captured_queries)
+        if response.status_code != 200:
+            raise CommandError(
+                f'{url} ответила кодом {response.status_code}.')
+        page, page_p95 = measure(lambda: client.get(url), repeat=repeat)
+        self.stdout.write(
+            f'страница поста: {page:.2f} мс (p95 {page_p95:.2f}), '
+            f'SQL-запросов: {queries}')
+        return read, written, page
@@ -0,0 +1,158 @@
+import random
+import statistics
+import threading
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from blog.models import Comment, Post
+from blog.views import get_filtered_posts
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+from django.test import override_settings
+
+from ._bench import benchmark_database, measure, seed
+
+User = get_user_model()
+
+
+def read_post(post_id):
+    """Те же запросы, что делает страница поста."""
+    post = Post.objects.select_related(
+        'author', 'category', 'location').get(pk=post_id)
+    list(post.comments.filter(is_published=True).select_related(
+        'author').order_by('created_at')[:10])
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает профили SQLITE_PROFILES на файловой тестовой базе: '
+        'сколько чтений страницы поста в секунду успевают читатели, пока '
+        'писатели добавляют комментарии, и во что обходится новое '
+        'соединение на каждый запрос (CONN_MAX_AGE = 0).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument('--seconds', type=float, default=5.0)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, posts, **options):
+        results = {}
+        # Без DEBUG соединения не копят журнал запросов.
+        with TemporaryDirectory() as directory, \
+                override_settings(DEBUG=False), \
+                benchmark_database(
+                    test_name=Path(directory) / 'bench.sqlite3'):
+            self.stdout.write(f'Наполняем базу: {posts} публикаций...')
+            seed(posts, comments=posts)
+            self.post_ids = list(
+                get_filtered_posts(Post.objects.all())
+                .values_list('pk', flat=True)[:1000])
+            self.user_ids = list(User.objects.values_list('pk', flat=True))
+            for profile, pragmas in settings.SQLITE_PROFILES.items():
+                with override_settings(SQLITE_PRAGMAS=pragmas):
+                    connections.close_all()
+                    results[profile] = self.run(profile, **options)
+            connections.close_all()
+
+        self.stdout.write(
+            '\nИтог (чтений/с, записей/с, p95 чтения мс, '
+            'соединение на запрос → постоянное мс):')
+        for profile, row in results.items():
+            self.stdout.write(
+                f'  {profile:<8} {row["reads"]:>8.0f} {row["writes"]:>7.0f} '
+                f'{row["read_p95"]:>8.2f}   '
+                f'{row["reopen"]:.3f} → {row["reuse"]:.3f}')
+
+    def run(self, profile, seconds, readers, writers, repeat, **options):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {profile} =='))
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.stdout.write(f'journal_mode: {cursor.fetchone()[0]}')
+
+        post_id = self.post_ids[0]
+        reuse, _ = measure(lambda: read_post(post_id), repeat=repeat)
+
+        def reopen():
+            connection.close()
+            read_post(post_id)
+
+        reopened, _ = measure(reopen, repeat=repeat)
+        self.stdout.write(
+            f'страница поста: новое соединение {reopened:.3f} мс, '
+            f'постоянное {reuse:.3f} мс')
+
+        stop = threading.Event()
+        stats = [
+            {'latencies': [], 'writes': 0, 'errors': 0}
+            for _ in range(readers + writers)
+        ]
+        threads = [
+            threading.Thread(target=self.reader, args=(stop, stat))
+            for stat in stats[:readers]
+        ] + [
+            threading.Thread(target=self.writer, args=(stop, stat))
+            for stat in stats[readers:]
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        latencies = sorted(
+            latency for stat in stats for latency in stat['latencies'])
+        row = {
+            'reads': len(latencies) / seconds,
+            'writes': sum(stat['writes'] for stat in stats) / seconds,
+            'read_p95': latencies[int(len(latencies) * 0.95)]
+            if latencies else 0.0,
+            'reopen': reopened,
+            'reuse': reuse,
+        }
+        errors = sum(stat['errors'] for stat in stats)
+        self.stdout.write(
+            f'читателей: {readers}, писателей: {writers}, {seconds:g} с: '
+            f'{row["reads"]:.0f} чтений/с (медиана '
+            f'{statistics.median(latencies) if latencies else 0:.2f} мс, '
+            f'p95 {row["read_p95"]:.2f} мс), {row["writes"]:.0f} '
+            f'записей/с, ошибок «database is locked»: {errors}')
+        return row
+
+    def reader(self, stop, stat):
+        rng = random.Random()
+        try:
+            while not stop.is_set():
+                started = time.perf_counter()
+                try:
+                    read_post(rng.choice(self.post_ids))
+                except OperationalError:
+                    stat['errors'] += 1
+                    continue
+                stat['latencies'].append(
+                    (time.perf_counter() - started) * 1000)
+        finally:
+            connection.close()
+
+    def writer(self, stop, stat):
+        rng = random.Random()
+        try:
+            while not stop.is_set():
+                try:
+                    Comment.objects.create(
+                        post_id=rng.choice(self.post_ids),
+                        author_id=rng.choice(self.user_ids),
+                        text='Комментарий',
+                    )
+                except OperationalError:
+                    stat['errors'] += 1
+                    continue
+                stat['writes'] += 1
+        finally:
+            connection.close()
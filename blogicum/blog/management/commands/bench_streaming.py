@@ -0,0 +1,90 @@
+import statistics
+import time
+import tracemalloc
+
+from blog.models import Post
+from blog.views import get_filtered_posts
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client, override_settings
+
+from ._bench import benchmark_database, seed
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает обычный и потоковый рендеринг (BLOG_STREAMING_PAGES) '
+        'страницы поста с комментариями и страниц ленты: время до первого '
+        'куска ответа, время до конца ответа и пик памяти на рендеринг.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--comments', type=int, default=50_000)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, posts, comments, repeat, **options):
+        # Кэш страниц выключен: мерим рендеринг, а не чтение из кэша.
+        with override_settings(DEBUG=False, BLOG_PAGE_CACHE_TIMEOUT=0), \
+                benchmark_database():
+            seed(posts, comments=comments)
+            post = get_filtered_posts(Post.objects.all()).order_by(
+                '-comment_count').first()
+            author = User.objects.annotate(
+                post_total=Count('post')).order_by('-post_total').first()
+            urls = {
+                'пост': f'/posts/{post.pk}/',
+                'лента': '/?page=50',
+                'профиль': f'/profile/{author.username}/?page=2',
+            }
+            client = Client()
+            client.force_login(User.objects.first())
+            results = {}
+            for streaming in (False, True):
+                with override_settings(BLOG_STREAMING_PAGES=streaming):
+                    for name, url in urls.items():
+                        results[name, streaming] = self.run(
+                            client, url, repeat)
+
+        self.stdout.write(
+            '\nИтог, медиана мс до первого куска / до конца, пик КиБ '
+            '(обычный → потоковый):')
+        for name in urls:
+            before, after = results[name, False], results[name, True]
+            self.stdout.write(
+                f'  {name:<8} '
+                f'{before[0]:>6.2f} → {after[0]:>6.2f}   '
+                f'{before[1]:>6.2f} → {after[1]:>6.2f}   '
+                f'{before[2]:>7.0f} → {after[2]:>7.0f}')
+
+    def fetch(self, client, url):
+        started = time.perf_counter()
+        response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f'{url} ответила кодом {response.status_code}.')
+        if not response.streaming:
+            first = time.perf_counter()
+            return first - started, first - started
+        chunks = iter(response.streaming_content)
+        next(chunks)
+        first = time.perf_counter()
+        for _ in chunks:
+            pass
+        return first - started, time.perf_counter() - started
+
+    def run(self, client, url, repeat):
+        for _ in range(2):
+            self.fetch(client, url)
+        first, total = zip(*(self.fetch(client, url) for _ in range(repeat)))
+        tracemalloc.start()
+        self.fetch(client, url)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return (
+            statistics.median(first) * 1000,
+            statistics.median(total) * 1000,
+            peak / 1024,
+        )
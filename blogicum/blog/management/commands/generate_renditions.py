@@ -0,0 +1,70 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from blog.models import Post
+from blog.renditions import (build_renditions, delete_renditions,
+                             renditions_are_current)
+from blog.tasks import bump_post_page_tags
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+def _build(pk_and_name):
+    pk, name = pk_and_name
+    try:
+        return pk, build_renditions(name), None
+    except Exception as error:
+        return pk, None, f'{type(error).__name__}: {error}'
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит уменьшенные копии и WebP для изображений публикаций, '
+        'у которых их ещё нет, в несколько процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Число процессов для обработки изображений.')
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Перестроить копии и для уже обработанных изображений.')
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько изображений отдавать процессам за один раз.')
+
+    def handle(self, *args, workers, force, batch_size, **options):
+        previous = {}
+        pending = []
+        for post in Post.objects.exclude(image='').exclude(
+                image__isnull=True).only(
+                    'pk', 'image', 'image_renditions').iterator():
+            if force or not renditions_are_current(post):
+                previous[post.pk] = post.image_renditions
+                pending.append((post.pk, post.image.name))
+        self.stdout.write(f'Изображений к обработке: {len(pending)}.')
+
+        done = failed = 0
+        # Дочерние процессы не работают с базой, им не нужны
+        # унаследованные соединения.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                updated = []
+                for pk, renditions, error in pool.map(_build, batch):
+                    if error:
+                        failed += 1
+                        self.stderr.write(f'Пост {pk}: {error}')
+                        continue
+                    Post.objects.filter(pk=pk).touch(
+                        image_renditions=renditions)
+                    delete_renditions(previous.pop(pk), keep=renditions)
+                    updated.append(pk)
+                if updated:
+                    bump_post_page_tags(updated)
+                done += len(updated)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: {done}, с ошибками: {failed}.'))
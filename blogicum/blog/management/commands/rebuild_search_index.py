@@ -0,0 +1,40 @@
+from blog.models import Post
+from blog.search import get_search_backend
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает поисковый индекс публикаций, читая посты '
+        'пачками, чтобы не держать всю таблицу в памяти.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько публикаций индексировать за одну транзакцию.')
+
+    def handle(self, *args, batch_size=500, **options):
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+
+        backend = get_search_backend()
+        backend.clear()
+        indexed = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk')
+                .only('pk', 'title', 'text')[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            with transaction.atomic():
+                backend.index(batch)
+            indexed += len(batch)
+            self.stdout.write(f'Проиндексировано: {indexed}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Индекс перестроен, публикаций: {indexed}.'))
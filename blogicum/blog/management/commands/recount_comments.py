@@ -0,0 +1,54 @@
+from blog.models import Post
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает сохранённые счётчики комментариев у публикаций '
+        'или, с флагом --check, только проверяет их.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Не исправлять счётчики, а только сообщить о расхождениях.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько публикаций обрабатывать за один UPDATE.')
+
+    def handle(self, *args, check=False, batch_size=1000, **options):
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть положительным.')
+
+        mismatched = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1]
+            stale = (
+                Post.objects.filter(pk__in=batch)
+                .with_actual_comment_count()
+                .exclude(comment_count=F('actual_comment_count'))
+            )
+            if check:
+                for post in stale.only('pk', 'comment_count'):
+                    mismatched += 1
+                    self.stdout.write(
+                        f'Пост {post.pk}: сохранено {post.comment_count}, '
+                        f'на самом деле {post.actual_comment_count}')
+            else:
+                stale_ids = list(stale.values_list('pk', flat=True))
+                mismatched += len(stale_ids)
+                Post.objects.filter(pk__in=stale_ids).recount_comments()
+
+        if check and mismatched:
+            raise CommandError(f'Расхождений в счётчиках: {mismatched}.')
+        verb = 'Найдено' if check else 'Исправлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} расхождений в счётчиках: {mismatched}.'))
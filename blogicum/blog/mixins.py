@@ -1,6 +1,360 @@
+from contextlib import nullcontext
+from hashlib import md5
+from threading import Lock
+
+from core.db_router import (reading_from_replica, replica_reads,
+                            sticks_to_primary)
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.functional import cached_property
+from django.utils.http import parse_http_date_safe
+from django.views.decorators.http import condition
+
+from .cache import FEED_TAG, cached_count, get_cached_page, store_page
+from .holes import fill_holes
+from .pagination import (CountLimitedPaginator, KeysetPaginator, count_up_to,
+                         encode_cursor)
+from .streaming import stream_template
 
 
 class MyLoginRequiredMixin(LoginRequiredMixin):
     login_url = '/auth/login/'
     redirect_field_name = 'next'
+
+
+class MemoizedObjectMixin:
+    """Запоминает объект, найденный `get_object()`, до конца запроса.
+
+    Экземпляр CBV создаётся на каждый запрос, поэтому повторные вызовы
+    из `test_func`, `handle_no_permission`, `get()`/`post()` и
+    `get_context_data` обходятся без лишних SELECT. Собственный способ
+    поиска объекта задаётся в `lookup_object()`, а не в `get_object()`.
+
+    `AsyncPageView` вызывает `get_object()` одновременно из нескольких
+    потоков, поэтому первый поиск идёт под блокировкой: остальные потоки
+    ждут его результат, а не ищут объект ещё раз.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._object_lock = Lock()
+
+    def lookup_object(self, queryset=None):
+        return super().get_object(queryset)
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return self.lookup_object(queryset)
+        with self._object_lock:
+            if not hasattr(self, '_memoized_object'):
+                self._memoized_object = self.lookup_object()
+        return self._memoized_object
+
+
+class KeysetPaginationMixin:
+    """Курсорная пагинация для `ListView` с лентой публикаций.
+
+    Запросы с `?after=`/`?before=` обслуживаются `KeysetPaginator`,
+    а обычные `?page=N` — `CountLimitedPaginator`, который не считает
+    записи дальше `BLOG_PAGINATOR_COUNT_LIMIT`. Страницы обоих видов
+    получают `next_cursor`/`previous_cursor`, так что переход
+    «вперёд/назад» всегда идёт по курсору.
+    """
+
+    cursor_after_kwarg = 'after'
+    cursor_before_kwarg = 'before'
+    paginator_class = CountLimitedPaginator
+
+    def paginate_queryset(self, queryset, page_size):
+        after = self.request.GET.get(self.cursor_after_kwarg)
+        before = self.request.GET.get(self.cursor_before_kwarg)
+        if after is None and before is None:
+            paginator, page, object_list, is_paginated = (
+                super().paginate_queryset(queryset, page_size))
+            page.next_cursor = (
+                encode_cursor(page[len(page) - 1])
+                if page.has_next() else None)
+            page.previous_cursor = (
+                encode_cursor(page[0]) if page.has_previous() else None)
+            return paginator, page, object_list, is_paginated
+
+        paginator = KeysetPaginator(queryset, page_size)
+        page = paginator.page(after=after, before=before)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_count_key(self):
+        """Ключ числа записей в кэше: представление и его фильтр."""
+        return f'{type(self).__name__}:{sorted(self.kwargs.items())}'
+
+    @cached_property
+    def object_count(self):
+        """Число записей ленты для пагинатора `?page=N`.
+
+        Считается не дальше `BLOG_PAGINATOR_COUNT_LIMIT` (см.
+        `count_up_to`) и хранится в кэше (см. `cached_count`).
+        """
+        limit = settings.BLOG_PAGINATOR_COUNT_LIMIT
+        return cached_count(
+            self.get_count_key(),
+            lambda: count_up_to(self.get_queryset(), limit),
+            limit=limit,
+        )
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        paginator = super().get_paginator(
+            queryset, per_page,
+            count_limit=settings.BLOG_PAGINATOR_COUNT_LIMIT, **kwargs)
+        paginator.count = self.object_count
+        return paginator
+
+    def get_page_versions(self):
+        """`(id, updated_at)` постов текущей страницы одним запросом.
+
+        Выбирает ту же страницу, что и `paginate_queryset`, но читает
+        только ключ и версию по индексу ленты. Для `?page=N` добавляется
+        число постов, от которого зависят ссылки пагинатора; пагинатор
+        потом берёт его из `object_count`, не считая заново. None —
+        страницу не удалось выбрать, пусть это обработает сама страница.
+        """
+        queryset = self.get_queryset().select_related(None)
+        page_size = self.get_paginate_by(queryset)
+        after = self.request.GET.get(self.cursor_after_kwarg)
+        before = self.request.GET.get(self.cursor_before_kwarg)
+        if after is not None or before is not None:
+            page = KeysetPaginator(
+                queryset.only('pk', 'pub_date', 'updated_at'), page_size,
+            ).page(after=after, before=before)
+            return (
+                tuple((post.pk, post.updated_at) for post in page),
+                page.has_next(),
+                page.has_previous(),
+            )
+
+        try:
+            number = int(self.request.GET.get(self.page_kwarg) or 1)
+        except ValueError:
+            return None
+        if number < 1:
+            return None
+        start = (number - 1) * page_size
+        rows = tuple(
+            queryset.values_list('pk', 'updated_at')[start:start + page_size])
+        return (rows, self.object_count) if rows else None
+
+
+def personalize_etag(etag, user):
+    """Слабый ETag страницы с содержимым `etag` для посетителя `user`.
+
+    Шапка и кнопки зависят от посетителя, поэтому один и тот же ответ
+    304 другому пользователю отдавать нельзя.
+    """
+    if etag is None:
+        return None
+    seed = repr((user.pk, user.get_username(), etag))
+    return f'W/"{md5(seed.encode()).hexdigest()}"'
+
+
+class ConditionalGetMixin:
+    """Отвечает на условный GET кодом 304, не строя страницу.
+
+    `get_validator_data()` одним дешёвым запросом собирает всё, от чего
+    зависит содержимое страницы (например, id и `updated_at` показанных
+    постов), или возвращает None, если валидаторы не нужны. Из этих
+    данных строится общий для всех посетителей `shared_etag`, а из него и
+    текущего пользователя — слабый ETag ответа: тело страницы не
+    совпадает побайтно из-за CSRF-токена. Время последнего изменения,
+    если его можно определить, возвращает `get_last_modified()`.
+    """
+
+    def get_validator_data(self):
+        return None
+
+    def get_last_modified(self):
+        return None
+
+    @cached_property
+    def validator_data(self):
+        return self.get_validator_data()
+
+    @cached_property
+    def shared_etag(self):
+        if self.validator_data is None:
+            return None
+        seed = repr(self.validator_data)
+        return f'W/"{md5(seed.encode()).hexdigest()}"'
+
+    def get_etag(self):
+        return personalize_etag(self.shared_etag, self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        view = condition(
+            etag_func=lambda *args, **kwargs: self.get_etag(),
+            last_modified_func=lambda *args, **kwargs: (
+                self.get_last_modified()),
+        )(super().get)
+        return view(request, *args, **kwargs)
+
+
+class SharedPageCacheMixin:
+    """Отдаёт страницу из кэша `blog.cache`, общего для всех посетителей.
+
+    Части страницы, зависящие от посетителя, шаблоны выводят тегом
+    `{% personal %}`: для кэша страница рендерится с метками на их месте,
+    а перед отдачей метки заполняются для текущего запроса (см.
+    blog/holes.py). Контекст, нужный этим частям помимо параметров тега,
+    возвращает `get_hole_context()`.
+
+    Кэшируются только ответы 200 на GET/HEAD и только если страницу
+    может видеть любой посетитель — это проверяет `can_share_page()`.
+    Посетитель, недавно что-то записавший, кэш не использует, чтобы
+    сразу увидеть свои изменения, а страница, прочитанная с реплики,
+    хранится не дольше, чем длится это окно (см. core/db_router.py).
+    Теги, от которых зависит страница, задаёт `get_page_cache_tags()`;
+    они должны вычисляться только из `self.kwargs`, без обращений к
+    базе. В кэше хранится общий ETag страницы, посетитель получает его
+    персональный вариант.
+    """
+
+    page_cache_enabled = False
+
+    def get_page_cache_tags(self):
+        return [FEED_TAG]
+
+    def get_hole_context(self):
+        return {}
+
+    def can_share_page(self):
+        return True
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['punch_holes'] = self.page_cache_enabled
+        return context
+
+    @cached_property
+    def cached_page(self):
+        """Ответ из кэша и версии тегов страницы.
+
+        Ответ None — страницы в кэше нет или кэш для запроса выключен.
+        """
+        request = self.request
+        self.page_cache_enabled = bool(
+            settings.BLOG_PAGE_CACHE_TIMEOUT
+            and request.method in ('GET', 'HEAD')
+            and not sticks_to_primary(request))
+        if not self.page_cache_enabled:
+            return None, None
+        return get_cached_page(request, self.get_page_cache_tags())
+
+    def dispatch(self, request, *args, **kwargs):
+        cached, versions = self.cached_page
+        if not self.page_cache_enabled:
+            return super().dispatch(request, *args, **kwargs)
+
+        if cached is not None:
+            cached['ETag'] = personalize_etag(cached['ETag'], request.user)
+            response = get_conditional_response(
+                request,
+                etag=cached['ETag'],
+                last_modified=parse_http_date_safe(
+                    cached.get('Last-Modified', '')),
+                response=cached,
+            )
+            if response is not cached:
+                return response
+            return fill_holes(cached, request, self.get_hole_context())
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.streaming:
+            response.streaming_content = self.stream_to_cache(
+                response.streaming_content, response, versions)
+        elif hasattr(response, 'render'):
+            response.render()
+            self.share_page(response, versions)
+        else:
+            return response
+        return fill_holes(response, request, self.get_hole_context())
+
+    def share_page(self, response, versions):
+        """Кладёт ответ в общий кэш, если его можно показать всем."""
+        if (response.status_code != 200 or response.cookies
+                or not self.can_share_page()):
+            return
+        own_etag = response.get('ETag')
+        shared_etag = getattr(self, 'shared_etag', None) or (
+            f'"{md5(response.content).hexdigest()}"')
+        response['ETag'] = shared_etag
+        store_page(
+            self.request, response, versions,
+            timeout=reading_from_replica()
+            and settings.DATABASE_REPLICA_STICKY_SECONDS)
+        response['ETag'] = own_etag or personalize_etag(
+            shared_etag, self.request.user)
+
+    def stream_to_cache(self, content, response, versions):
+        """Отдаёт куски потокового ответа и в конце кладёт его в кэш."""
+        chunks = []
+        for chunk in content:
+            chunks.append(chunk)
+            yield chunk
+        page = HttpResponse(
+            b''.join(chunks), content_type=response['Content-Type'],
+            status=response.status_code)
+        page.cookies = response.cookies
+        for header in ('ETag', 'Last-Modified'):
+            if response.has_header(header):
+                page[header] = response[header]
+        self.share_page(page, versions)
+
+
+class ReplicaReadMixin:
+    """Читает данные страницы с реплики базы (см. core/db_router.py).
+
+    Ответ рендерится здесь же, чтобы ленивые запросы шаблона тоже ушли
+    на реплику. Посетитель, недавно что-то записавший, читает с основной
+    базы.
+    """
+
+    def read_scope(self):
+        """Контекст, внутри которого страница читает данные."""
+        if (self.request.method not in ('GET', 'HEAD')
+                or sticks_to_primary(self.request)):
+            return nullcontext()
+        return replica_reads()
+
+    def dispatch(self, request, *args, **kwargs):
+        with self.read_scope():
+            response = super().dispatch(request, *args, **kwargs)
+            if response.streaming:
+                response.streaming_content = self.read_lazily(
+                    response.streaming_content)
+            elif hasattr(response, 'render'):
+                response.render()
+        return response
+
+    def read_lazily(self, chunks):
+        """Рендерит куски потокового ответа в том же контексте чтения."""
+        chunks = iter(chunks)
+        while True:
+            with self.read_scope():
+                chunk = next(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+
+class StreamingRenderMixin:
+    """Отдаёт страницу потоком при `BLOG_STREAMING_PAGES`.
+
+    Строки, выведенные в шаблоне тегом `{% stream %}`, рендерятся и
+    уходят посетителю по одной после остальной страницы (см.
+    blog/streaming.py).
+    """
+
+    def render_to_response(self, context, **response_kwargs):
+        if not settings.BLOG_STREAMING_PAGES:
+            return super().render_to_response(context, **response_kwargs)
+        return stream_template(
+            self.get_template_names(), context, self.request)
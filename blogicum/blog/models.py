@@ -2,6 +2,8 @@ from blog.constants import MAX_LENGTH
 from core.models import PublishedModel
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 User = get_user_model()
@@ -45,6 +47,37 @@ class Category(PublishedModel):
         return self.title
 
 
+def published_comment_total():
+    """Подзапрос с числом опубликованных комментариев к посту."""
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(post=OuterRef('pk'), is_published=True)
+            .order_by().values('post')
+            .annotate(total=Count('pk')).values('total')
+        ),
+        0,
+    )
+
+
+class PostQuerySet(models.QuerySet):
+    def with_actual_comment_count(self):
+        """Аннотирует посты реальным числом опубликованных комментариев."""
+        return self.annotate(
+            actual_comment_count=published_comment_total())
+
+    def recount_comments(self):
+        """Пересчитывает сохранённый `comment_count` одним UPDATE."""
+        return self.touch(comment_count=published_comment_total())
+
+    def touch(self, **changes):
+        """Обновляет постам `updated_at` (и `changes`) одним UPDATE.
+
+        Нужен везде, где содержимое страниц поста меняется в обход
+        `save()`: по `updated_at` строятся ETag и Last-Modified.
+        """
+        return self.update(updated_at=timezone.now(), **changes)
+
+
 class Post(PublishedModel):
     title = models.CharField(
         verbose_name='Заголовок',
@@ -79,11 +112,40 @@ class Post(PublishedModel):
         verbose_name='Категория'
     )
     image = models.ImageField(upload_to='posts/', blank=True, null=True)
+    image_renditions = models.JSONField(
+        verbose_name='Уменьшенные копии изображения',
+        default=dict,
+        editable=False
+    )
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False
+    )
+    updated_at = models.DateTimeField(
+        verbose_name='Изменено',
+        auto_now=True
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=Q(is_published=True),
+                name='post_feed_idx'),
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                condition=Q(is_published=True),
+                name='post_category_feed_idx'),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -98,6 +160,50 @@ class Comment(PublishedModel):
     class Meta:
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at'],
+                condition=Q(is_published=True),
+                name='comment_post_created_idx'),
+        ]
 
         def __str__(self):
             return self.verbose_name
+
+
+class SearchEntry(models.Model):
+    """Запись обратного индекса поиска: терм встречается в посте."""
+
+    post = models.ForeignKey(Post, on_delete=models.CASCADE,
+                             related_name='search_entries')
+    term = models.CharField(max_length=64)
+    weight = models.FloatField()
+
+    class Meta:
+        verbose_name = 'запись поискового индекса'
+        verbose_name_plural = 'Поисковый индекс'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['term', 'post'], name='search_entry_term_post_uniq'),
+        ]
+
+
+class SearchDocument(models.Model):
+    """Строка виртуальной таблицы FTS5 поискового индекса.
+
+    Таблицу создаёт миграция, и только если SQLite поддерживает FTS5
+    (см. blog/search.py); модель нужна, чтобы соединять её с постами в
+    запросах ORM. `document` — скрытый столбец FTS5 с именем таблицы:
+    к нему применяются MATCH и bm25().
+    """
+
+    post = models.OneToOneField(
+        Post, primary_key=True, db_column='rowid',
+        on_delete=models.DO_NOTHING, related_name='search_document')
+    title = models.TextField()
+    text = models.TextField()
+    document = models.TextField(db_column='blog_post_search')
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_search'
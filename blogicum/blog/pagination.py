@@ -0,0 +1,189 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+
+def encode_cursor(obj, field='pub_date'):
+    """Упаковывает позицию объекта в ленте в непрозрачный токен."""
+    raw = f'{getattr(obj, field).isoformat()}|{obj.pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковывает токен в пару (дата, id) или бросает Http404."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        value, pk = raw.rsplit('|', 1)
+        value = parse_datetime(value)
+        pk = int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise Http404('Некорректный курсор страницы')
+    if not isinstance(value, datetime):
+        raise Http404('Некорректный курсор страницы')
+    return value, pk
+
+
+class KeysetPage:
+    """Страница ленты, выбранная по курсору `(дата, id)`.
+
+    Повторяет ту часть интерфейса `django.core.paginator.Page`,
+    которой пользуются шаблоны, но не знает ни номера страницы,
+    ни общего количества записей.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, has_next, has_previous,
+                 field='pub_date'):
+        self.object_list = object_list
+        self.field = field
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next and self.object_list:
+            return encode_cursor(self.object_list[-1], self.field)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous and self.object_list:
+            return encode_cursor(self.object_list[0], self.field)
+        return None
+
+
+class KeysetPaginator:
+    """Пагинатор по ключу `(field, id)`.
+
+    По умолчанию листает ленту «от новых к старым» по `pub_date`.
+    Каждая страница — это `WHERE (field, id) < курсор ORDER BY ...
+    LIMIT n + 1`, поэтому стоимость не зависит от глубины страницы и
+    не требует `COUNT(*)`.
+    """
+
+    def __init__(self, queryset, per_page, field='pub_date',
+                 descending=True):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.field = field
+        self.descending = descending
+
+    def _ordering(self, forward):
+        sign = '-' if self.descending == forward else ''
+        return f'{sign}{self.field}', f'{sign}pk'
+
+    def _beyond(self, cursor, forward):
+        value, pk = decode_cursor(cursor)
+        lookup = 'lt' if self.descending == forward else 'gt'
+        return (
+            Q(**{f'{self.field}__{lookup}': value})
+            | Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def page(self, after=None, before=None):
+        if before is not None:
+            rows = list(
+                self.queryset.filter(self._beyond(before, forward=False))
+                .order_by(*self._ordering(forward=False))[:self.per_page + 1]
+            )
+            if len(rows) <= self.per_page:
+                return self.page()
+            rows = rows[:self.per_page]
+            rows.reverse()
+            return KeysetPage(
+                rows, has_next=True, has_previous=True, field=self.field)
+
+        queryset = self.queryset.order_by(*self._ordering(forward=True))
+        if after is not None:
+            queryset = queryset.filter(self._beyond(after, forward=True))
+        rows = list(queryset[:self.per_page + 1])
+        return KeysetPage(
+            rows[:self.per_page],
+            has_next=len(rows) > self.per_page,
+            has_previous=after is not None,
+            field=self.field,
+        )
+
+
+def count_up_to(queryset, limit):
+    """Число записей, но не больше `limit + 1`; `limit` 0 — точное.
+
+    `COUNT` по подзапросу с `LIMIT` перебирает не больше `limit + 1`
+    строк, сколько бы записей ни подходило под фильтр.
+    """
+    if not limit:
+        return queryset.count()
+    return queryset[:limit + 1].count()
+
+
+class CountLimitedPage(Page):
+    def has_next(self):
+        # За последней пронумерованной страницей могут быть ещё записи.
+        return super().has_next() or (
+            self.paginator.count_is_approximate
+            and self.number == self.paginator.num_pages)
+
+
+class CountLimitedPaginator(Paginator):
+    """Пагинатор, который не считает записи дальше `count_limit`.
+
+    Если записей больше порога, число страниц известно только до
+    порога: ссылки ведут не дальше него, а ссылки на последнюю страницу
+    нет. Дальше ленту листают по курсору (см. `KeysetPaginationMixin`).
+    """
+
+    def __init__(self, *args, count_limit=0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_limit = count_limit
+
+    @cached_property
+    def count(self):
+        return count_up_to(self.object_list, self.count_limit)
+
+    @property
+    def count_is_approximate(self):
+        return bool(self.count_limit) and self.count > self.count_limit
+
+    @cached_property
+    def num_pages(self):
+        if not self.count_is_approximate:
+            return super().num_pages
+        return max(1, self.count_limit // self.per_page)
+
+    def _get_page(self, *args, **kwargs):
+        return CountLimitedPage(*args, **kwargs)
+
+    def get_elided_page_range(self, number=1, *, on_each_side=3, on_ends=2):
+        pages = list(super().get_elided_page_range(
+            number, on_each_side=on_each_side, on_ends=on_ends))
+        if not self.count_is_approximate:
+            return pages
+        last = min(self.validate_number(number) + on_each_side,
+                   self.num_pages)
+        return pages[:pages.index(last) + 1] + [self.ELLIPSIS]
@@ -0,0 +1,114 @@
+"""Уменьшенные копии изображений публикаций.
+
+Для каждого `Post.image` строятся копии фиксированной ширины
+(`BLOG_IMAGE_RENDITION_WIDTHS`) в исходном формате и в WebP. Имена
+готовых файлов сохраняются в `Post.image_renditions`, поэтому шаблонам
+не нужно проверять их наличие на диске. Копии прежнего изображения
+удаляются, когда их заменяют новые, когда изображение убирают из поста
+и когда удаляют сам пост.
+"""
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+RENDITIONS_DIR = 'renditions'
+EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png'}
+
+
+def _target_widths(source_width):
+    widths = [width for width in settings.BLOG_IMAGE_RENDITION_WIDTHS
+              if width < source_width]
+    return widths + [source_width]
+
+
+def _encode(image, image_format, quality):
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, quality=quality)
+    return buffer.getvalue()
+
+
+def build_renditions(name, storage=default_storage):
+    """Строит копии изображения `name` и возвращает их описание.
+
+    Функция не обращается к базе, поэтому её можно запускать в
+    отдельных процессах.
+    """
+    with storage.open(name) as source_file:
+        source = Image.open(source_file)
+        source_format = source.format
+        source = ImageOps.exif_transpose(source)
+        source.load()
+
+    fallback_format = 'JPEG' if source_format in ('JPEG', 'MPO') else 'PNG'
+    stem, _ = posixpath.splitext(name)
+    result = {
+        'source': name,
+        'width': source.width,
+        'fallback': [],
+        'webp': [],
+    }
+    for width in _target_widths(source.width):
+        if width == source.width:
+            resized = source
+        else:
+            height = max(1, round(source.height * width / source.width))
+            resized = source.resize(
+                (width, height), Image.Resampling.LANCZOS)
+        variants = [('webp', 'WEBP', 'webp')]
+        if width != source.width:
+            variants.append(
+                ('fallback', fallback_format, EXTENSIONS[fallback_format]))
+        for key, image_format, extension in variants:
+            target = posixpath.join(
+                RENDITIONS_DIR, f'{stem}-{width}w.{extension}')
+            if storage.exists(target):
+                storage.delete(target)
+            saved = storage.save(target, ContentFile(_encode(
+                resized, image_format, settings.BLOG_IMAGE_QUALITY)))
+            result[key].append([width, saved])
+    return result
+
+
+def rendition_files(renditions):
+    """Имена файлов всех копий из описания `renditions`."""
+    return {
+        name for key in ('fallback', 'webp')
+        for _, name in renditions.get(key, [])
+    }
+
+
+def delete_renditions(renditions, keep=None, storage=default_storage):
+    """Удаляет файлы копий `renditions`, кроме упомянутых в `keep`."""
+    for name in rendition_files(renditions) - rendition_files(keep or {}):
+        storage.delete(name)
+
+
+def renditions_are_current(post):
+    return bool(post.image) and (
+        post.image_renditions.get('source') == post.image.name)
+
+
+def update_post_renditions(post):
+    """Перестраивает копии изображения поста, если оно сменилось.
+
+    Возвращает True, если копии поста изменились.
+    """
+    if not post.image:
+        if not post.image_renditions:
+            return False
+        renditions = {}
+    elif renditions_are_current(post):
+        return False
+    else:
+        renditions = build_renditions(post.image.name)
+    type(post).objects.filter(pk=post.pk).touch(
+        image_renditions=renditions)
+    delete_renditions(post.image_renditions, keep=renditions)
+    post.image_renditions = renditions
+    return True
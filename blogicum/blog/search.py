@@ -0,0 +1,209 @@
+"""Полнотекстовый поиск по публикациям.
+
+Индекс строится по `Post.title` и `Post.text` и обновляется сигналами
+при сохранении и удалении поста. Видимость постов проверяется в момент
+запроса тем же фильтром, что и в лентах, поэтому в индекс попадают все
+посты, включая снятые с публикации и отложенные.
+
+Хранилищ индекса два:
+
+* `Fts5Backend` — виртуальная таблица SQLite FTS5, ранжирование bm25;
+* `InvertedIndexBackend` — обратный индекс в обычной таблице
+  `SearchEntry`, ранжирование TF-IDF; работает на любой базе.
+
+Оба получают термы из `tokenize`, поэтому слова нормализуются одинаково.
+Какое хранилище используется, задаёт `BLOG_SEARCH_BACKEND`. После его
+смены или изменения `tokenize` индекс нужно перестроить командой
+`rebuild_search_index`.
+"""
+import functools
+import math
+import re
+import sqlite3
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import (BooleanField, Case, Count, F, FloatField, Func,
+                              Sum, Value, When)
+
+from .cache import cached_count
+from .models import Post, SearchEntry
+from .stemming import normalize, stem
+
+FTS_TABLE = 'blog_post_search'
+TITLE_WEIGHT = 5.0
+MAX_TERM_LENGTH = 64
+
+WORD_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Разбивает текст на термы — основы слов в порядке следования.
+
+    Регистр и «ё» нормализуются, русские слова сводятся к основе
+    (см. blog/stemming.py), поэтому «Лесу» и «лес» дают один терм.
+    """
+    return [
+        stem(word) for word in WORD_RE.findall(normalize(text))
+        if len(word) <= MAX_TERM_LENGTH
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def sqlite_has_fts5():
+    try:
+        sqlite3.connect(':memory:').execute(
+            'CREATE VIRTUAL TABLE probe USING fts5(body)')
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def fts5_available(db_connection=connection):
+    return db_connection.vendor == 'sqlite' and sqlite_has_fts5()
+
+
+class Match(Func):
+    """`столбец MATCH запрос` — условие полнотекстового поиска FTS5."""
+
+    template = '%(expressions)s'
+    arg_joiner = ' MATCH '
+    output_field = BooleanField()
+
+
+class Bm25(Func):
+    """Ранг bm25() строки FTS5; веса столбцов — в аргументах."""
+
+    function = 'bm25'
+    output_field = FloatField()
+
+
+class Fts5Backend:
+    """Индекс в виртуальной таблице FTS5, ключ строки — id поста."""
+
+    def index(self, posts):
+        rows = [
+            (post.pk,
+             ' '.join(tokenize(post.title)),
+             ' '.join(tokenize(post.text)))
+            for post in posts
+        ]
+        if not rows:
+            return
+        self.remove([pk for pk, _, _ in rows])
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                'VALUES (%s, %s, %s)', rows)
+
+    def remove(self, post_ids):
+        post_ids = list(post_ids)
+        if not post_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(post_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+                post_ids)
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def search(self, queryset, terms):
+        # Термы состоят только из букв, цифр и подчёркивания, поэтому
+        # их можно безопасно взять в кавычки как фразы FTS5.
+        match = ' '.join(f'"{term}"' for term in terms)
+        document = F('search_document__document')
+        return (
+            # Под LEFT JOIN FTS5 не выполняет MATCH: условие на наличие
+            # строки делает соединение внутренним.
+            queryset.filter(
+                Match(document, Value(match)), search_document__isnull=False)
+            # bm25() тем меньше, чем лучше совпадение.
+            .annotate(search_rank=-Bm25(
+                document, Value(TITLE_WEIGHT), Value(1.0)))
+            .order_by('-search_rank', '-pub_date', '-id')
+        )
+
+
+class InvertedIndexBackend:
+    """Обратный индекс «терм → пост» в таблице `SearchEntry`.
+
+    Вес записи — насыщающаяся частота терма в посте с учётом
+    `TITLE_WEIGHT`; при поиске он умножается на IDF терма.
+    """
+
+    def index(self, posts):
+        posts = list(posts)
+        if not posts:
+            return
+        entries = []
+        for post in posts:
+            frequencies = Counter(tokenize(post.text))
+            for term in tokenize(post.title):
+                frequencies[term] += TITLE_WEIGHT
+            entries.extend(
+                SearchEntry(post_id=post.pk, term=term,
+                            weight=frequency / (frequency + 1.2))
+                for term, frequency in frequencies.items()
+            )
+        self.remove(post.pk for post in posts)
+        SearchEntry.objects.bulk_create(entries, batch_size=1000)
+
+    def remove(self, post_ids):
+        SearchEntry.objects.filter(post_id__in=list(post_ids)).delete()
+
+    def clear(self):
+        SearchEntry.objects.all().delete()
+
+    def search(self, queryset, terms):
+        document_counts = dict(
+            SearchEntry.objects.filter(term__in=terms)
+            .values('term').annotate(total=Count('pk'))
+            .values_list('term', 'total')
+        )
+        if len(document_counts) < len(terms):
+            return queryset.none()
+        # Для IDF хватает числа постов из кэша: оно сбрасывается тегом
+        # `post-count` при добавлении и удалении постов.
+        total = cached_count('search:posts', Post.objects.count)
+        rank = Sum(Case(
+            *(When(search_entries__term=term,
+                   then=F('search_entries__weight') * Value(math.log(
+                       1 + (total - count + 0.5) / (count + 0.5))))
+              for term, count in document_counts.items()),
+            output_field=FloatField(),
+        ))
+        return (
+            queryset.filter(search_entries__term__in=terms)
+            .annotate(search_rank=rank, matched_terms=Count('search_entries'))
+            .filter(matched_terms=len(terms))
+            .order_by('-search_rank', '-pub_date', '-id')
+        )
+
+
+BACKENDS = {
+    'fts5': Fts5Backend,
+    'inverted': InvertedIndexBackend,
+}
+
+
+def get_search_backend():
+    name = settings.BLOG_SEARCH_BACKEND
+    if name == 'auto':
+        name = 'fts5' if fts5_available() else 'inverted'
+    return BACKENDS[name]()
+
+
+def search_posts(queryset, query):
+    """Оставляет в `queryset` посты, содержащие все слова запроса.
+
+    Результат упорядочен по релевантности, а при равной — от новых
+    к старым. Пустой запрос ничего не находит.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return queryset.none()
+    return get_search_backend().search(queryset, terms)
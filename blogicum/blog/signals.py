@@ -0,0 +1,175 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+from .cache import (CATALOG_TAG, COUNT_TAG, FEED_TAG, SITEMAP_TAG, bump_tags,
+                    category_tag, post_tag, sitemap_tag)
+from .models import Category, Comment, Location, Post
+from .renditions import delete_renditions, renditions_are_current
+from .search import get_search_backend
+from .sitemaps import PostSitemap, ProfileSitemap, chunk_number
+from .tasks import build_post_renditions
+
+User = get_user_model()
+
+# Посты, удаляемые в текущем потоке: их комментарии уходят каскадом,
+# и пересчитывать счётчик для каждого из них незачем.
+_deleting = threading.local()
+
+
+def _deleting_post_ids():
+    if not hasattr(_deleting, 'post_ids'):
+        _deleting.post_ids = set()
+    return _deleting.post_ids
+
+
+def _category_tags(category_ids):
+    slugs = Category.objects.filter(
+        pk__in=set(category_ids) - {None}).values_list('slug', flat=True)
+    return [category_tag(slug) for slug in slugs]
+
+
+def _post_sitemap_tags(post_ids):
+    return [
+        sitemap_tag(PostSitemap.section, chunk)
+        for chunk in {chunk_number(post_id) for post_id in post_ids}
+    ]
+
+
+@receiver(post_init, sender=Comment)
+def remember_comment_post(sender, instance, **kwargs):
+    instance._initial_post_id = instance.post_id
+
+
+@receiver(post_init, sender=Post)
+def remember_post_state(sender, instance, **kwargs):
+    # Поля, отложенные через .only()/.defer(), не читаем: иначе каждый
+    # такой объект стоил бы отдельного запроса.
+    values = instance.__dict__
+    instance._initial_category_id = values.get('category_id')
+    instance._initial_search_text = (values.get('title'), values.get('text'))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def update_comment_count(sender, instance, **kwargs):
+    """Держит `Post.comment_count` в согласии с опубликованными комментариями.
+
+    Срабатывает на создание, удаление, снятие с публикации и перенос
+    комментария к другому посту — в том числе из админки.
+    """
+    post_ids = (
+        {instance.post_id, instance._initial_post_id}
+        - {None} - _deleting_post_ids())
+    if not post_ids:
+        return
+    posts = Post.objects.filter(pk__in=post_ids)
+    # Страница поста меняется и при правке текста комментария, поэтому
+    # `updated_at` обновляется, даже если счётчик остался прежним.
+    posts.recount_comments()
+    bump_tags(
+        FEED_TAG,
+        *(post_tag(post_id) for post_id in post_ids),
+        *_post_sitemap_tags(post_ids),
+        *_category_tags(posts.values_list('category_id', flat=True)),
+    )
+    instance._initial_post_id = instance.post_id
+
+
+@receiver(pre_delete, sender=Post)
+def mark_post_deleting(sender, instance, **kwargs):
+    _deleting_post_ids().add(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    _deleting_post_ids().discard(instance.pk)
+    bump_tags(
+        FEED_TAG,
+        COUNT_TAG,
+        post_tag(instance.pk),
+        *_post_sitemap_tags([instance.pk]),
+        *_category_tags(
+            [instance.category_id, instance._initial_category_id]),
+    )
+    instance._initial_category_id = instance.category_id
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_catalog_pages(sender, instance, **kwargs):
+    bump_tags(
+        FEED_TAG, CATALOG_TAG, COUNT_TAG if sender is Category else None)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def touch_catalog_posts(sender, instance, **kwargs):
+    # pre_delete: после удаления ссылка на объект у постов уже обнулена.
+    field = 'category' if sender is Category else 'location'
+    Post.objects.filter(**{field: instance}).touch()
+
+
+@receiver(post_save, sender=User)
+def touch_user_posts(sender, instance, created, update_fields=None,
+                     **kwargs):
+    """Обновляет посты и кэш страниц, где показано имя пользователя."""
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    Post.objects.filter(
+        Q(author=instance) | Q(comments__author=instance)).touch()
+    bump_tags(FEED_TAG, CATALOG_TAG)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_profile_sitemap(sender, instance, signal, created=False,
+                               update_fields=None, **kwargs):
+    if update_fields == frozenset({'last_login'}):
+        return
+    # Новый или удалённый пользователь может добавить или убрать часть
+    # в индексе карты сайта.
+    bump_tags(
+        sitemap_tag(ProfileSitemap.section, chunk_number(instance.pk)),
+        (created or signal is post_delete) and SITEMAP_TAG,
+    )
+
+
+@receiver(post_save, sender=Post)
+def refresh_image_renditions(sender, instance, raw=False, **kwargs):
+    if raw or renditions_are_current(instance):
+        return
+    if instance.image or instance.image_renditions:
+        build_post_renditions.delay(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def remove_image_renditions(sender, instance, **kwargs):
+    # Файлы удаляются только после фиксации транзакции: при её откате
+    # пост остаётся со ссылками на свои копии.
+    if instance.image_renditions:
+        renditions = instance.image_renditions
+        transaction.on_commit(lambda: delete_renditions(renditions))
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, created, **kwargs):
+    search_text = (instance.title, instance.text)
+    if created or search_text != instance._initial_search_text:
+        get_search_backend().index([instance])
+        instance._initial_search_text = search_text
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    get_search_backend().remove([instance.pk])
@@ -0,0 +1,208 @@
+"""Карта сайта для поисковых роботов.
+
+`/sitemap.xml` — индекс, который ссылается на части разделов `posts`,
+`categories` и `profiles` (`/sitemap-<раздел>.xml?p=<часть>`). Часть
+N содержит объекты с id от `(N - 1) * BLOG_SITEMAP_CHUNK_SIZE + 1` до
+`N * BLOG_SITEMAP_CHUNK_SIZE` включительно. Границы частей не зависят
+от того, какие посты сейчас видны, поэтому:
+
+* часть читается по индексу первичного ключа пачками `pk > последний`,
+  без OFFSET, как бы далеко от начала она ни лежала;
+* правка поста меняет только его часть, и сигналы сбрасывают в кэше
+  страниц (`blog.cache`) только её тег `sitemap:posts:<часть>`.
+
+Снятые с публикации и удалённые объекты делают часть короче лимита,
+но не сдвигают соседние части.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sitemaps import Sitemap
+from django.contrib.sitemaps import views as sitemap_views
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger
+from django.db.models import Max
+from django.http import Http404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, set_response_etag
+from django.utils.functional import cached_property
+from django.utils.http import parse_http_date_safe
+
+from .cache import (CATALOG_TAG, FEED_TAG, SITEMAP_TAG, get_cached_page,
+                    sitemap_tag, store_page)
+from .models import Category, Post
+from .views import get_filtered_posts
+
+User = get_user_model()
+
+SITEMAP_BATCH_SIZE = 2000
+
+
+def chunk_number(pk):
+    """Номер части карты сайта, в которую попадает объект с этим id."""
+    return (pk - 1) // settings.BLOG_SITEMAP_CHUNK_SIZE + 1
+
+
+class IdRangePaginator:
+    """Делит queryset на страницы по диапазонам первичного ключа.
+
+    Число страниц определяется наибольшим id модели — один запрос
+    по индексу, без COUNT по отфильтрованной выборке.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    @cached_property
+    def num_pages(self):
+        top = self.queryset.model._default_manager.aggregate(
+            top=Max('pk'))['top'] or 0
+        return max(1, -(-top // self.per_page))
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер части должен быть целым числом.')
+        if number < 1 or number > self.num_pages:
+            raise EmptyPage('Такой части нет.')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        start = (number - 1) * self.per_page
+        return Page(
+            self.iterate(start, start + self.per_page), number, self)
+
+    def iterate(self, start, stop):
+        """Объекты с `start < pk <= stop` по возрастанию id, пачками."""
+        last_pk = start
+        while True:
+            batch = list(
+                self.queryset.filter(pk__gt=last_pk, pk__lte=stop)
+                .order_by('pk')[:SITEMAP_BATCH_SIZE])
+            yield from batch
+            if len(batch) < SITEMAP_BATCH_SIZE:
+                return
+            last_pk = batch[-1].pk
+
+
+class ChunkedSitemap(Sitemap):
+    """Раздел карты сайта, нарезанный на части по диапазонам id."""
+
+    section = None
+
+    @property
+    def limit(self):
+        return settings.BLOG_SITEMAP_CHUNK_SIZE
+
+    @property
+    def paginator(self):
+        return IdRangePaginator(self.items(), self.limit)
+
+    def get_cache_tags(self, page):
+        return [sitemap_tag(self.section, page)]
+
+
+class PostSitemap(ChunkedSitemap):
+    section = 'posts'
+
+    def items(self):
+        return get_filtered_posts(Post.objects.all()).select_related(
+            None).only('pk', 'updated_at')
+
+    def location(self, item):
+        return reverse('blog:post_detail', kwargs={'id': item.pk})
+
+    def lastmod(self, item):
+        return item.updated_at
+
+    def get_cache_tags(self, page):
+        # Видимость постов зависит и от публикации их категорий.
+        return [*super().get_cache_tags(page), CATALOG_TAG]
+
+
+class CategorySitemap(ChunkedSitemap):
+    section = 'categories'
+
+    def items(self):
+        return Category.objects.filter(is_published=True).only('pk', 'slug')
+
+    def location(self, item):
+        return reverse('blog:category_posts', kwargs={
+            'category_slug': item.slug})
+
+    def get_cache_tags(self, page):
+        return [CATALOG_TAG]
+
+
+class ProfileSitemap(ChunkedSitemap):
+    section = 'profiles'
+
+    def items(self):
+        return User.objects.filter(is_active=True).only(
+            'pk', User.USERNAME_FIELD)
+
+    def location(self, item):
+        return reverse('blog:profile', kwargs={
+            'username': item.get_username()})
+
+
+SITEMAPS = {
+    sitemap.section: sitemap
+    for sitemap in (PostSitemap, CategorySitemap, ProfileSitemap)
+}
+
+
+def _cached_response(request, tags, render):
+    """Отдаёт XML из кэша страниц или рендерит и кэширует его.
+
+    Карта сайта одинакова для всех посетителей, поэтому кэшируется и
+    для авторизованных; ETag позволяет роботам получать 304.
+    """
+    use_cache = bool(settings.BLOG_PAGE_CACHE_TIMEOUT)
+    response = versions = None
+    if use_cache:
+        response, versions = get_cached_page(request, tags)
+    if response is None:
+        response = render().render()
+        set_response_etag(response)
+        if use_cache:
+            store_page(request, response, versions)
+    return get_conditional_response(
+        request,
+        etag=response['ETag'],
+        last_modified=parse_http_date_safe(
+            response.get('Last-Modified', '')),
+        response=response,
+    )
+
+
+@sitemap_views.x_robots_tag
+def sitemap_index(request):
+    # Новые части появляются с новыми постами, категориями и
+    # пользователями; первые два случая уже сбрасывают `feed`/`catalog`.
+    return _cached_response(
+        request, [FEED_TAG, CATALOG_TAG, SITEMAP_TAG],
+        lambda: sitemap_views.index(
+            request,
+            {section: sitemap() for section, sitemap in SITEMAPS.items()},
+            sitemap_url_name='blog:sitemap_section',
+        ),
+    )
+
+
+@sitemap_views.x_robots_tag
+def sitemap_section(request, section):
+    if section not in SITEMAPS:
+        raise Http404(f'Раздела карты сайта «{section}» нет.')
+    sitemap = SITEMAPS[section]()
+    page = request.GET.get('p', '1')
+    try:
+        int(page)
+    except ValueError:
+        raise Http404(f'Части карты сайта «{page}» нет.')
+    return _cached_response(
+        request, sitemap.get_cache_tags(int(page)),
+        lambda: sitemap_views.sitemap(
+            request, {section: sitemap}, section=section),
+    )
@@ -0,0 +1,150 @@
+"""Стемминг русских слов для поискового индекса.
+
+Реализация алгоритма Snowball для русского языка
+(https://snowballstem.org/algorithms/russian/stemmer.html): слово
+приводится к основе отсечением окончаний, суффиксов причастий,
+деепричастий, возвратных частиц и т. п. Словарь не нужен, поэтому
+стемминг работает на любом тексте, но основы не всегда совпадают с
+леммами: «бегу» и «бежать» дадут разные основы.
+
+Слова в тексте сильно повторяются, поэтому результаты `stem`
+запоминаются: при индексации большого корпуса почти все обращения
+попадают в кэш.
+"""
+import functools
+import re
+
+VOWELS = frozenset('аеиоуыэюя')
+CYRILLIC_WORD_RE = re.compile('[а-я]+')
+STEM_CACHE_SIZE = 200_000
+
+
+def _endings(*groups):
+    """Окончания, отсортированные от длинных к коротким."""
+    return sorted(set().union(*groups), key=len, reverse=True)
+
+
+# Окончания из первой группы отсекаются, только если перед ними «а»
+# или «я»; сама буква остаётся в основе.
+PERFECTIVE_GERUND_1 = {'в', 'вши', 'вшись'}
+PERFECTIVE_GERUND_2 = {'ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'}
+ADJECTIVE = {
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+    'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+    'ая', 'яя', 'ою', 'ею',
+}
+PARTICIPLE_1 = {'ем', 'нн', 'вш', 'ющ', 'щ'}
+PARTICIPLE_2 = {'ивш', 'ывш', 'ующ'}
+REFLEXIVE = {'ся', 'сь'}
+VERB_1 = {
+    'ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+    'ют', 'ны', 'ть', 'ешь', 'нно',
+}
+VERB_2 = {
+    'ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+    'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+    'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю',
+}
+NOUN = {
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии',
+    'и', 'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам',
+    'ом', 'о', 'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия',
+    'ья', 'я',
+}
+DERIVATIONAL = {'ост', 'ость'}
+SUPERLATIVE = {'ейш', 'ейше'}
+
+_SUFFIXES = {
+    'gerund': (_endings(PERFECTIVE_GERUND_1, PERFECTIVE_GERUND_2),
+               PERFECTIVE_GERUND_1),
+    'adjective': (_endings(ADJECTIVE), set()),
+    'participle': (_endings(PARTICIPLE_1, PARTICIPLE_2), PARTICIPLE_1),
+    'reflexive': (_endings(REFLEXIVE), set()),
+    'verb': (_endings(VERB_1, VERB_2), VERB_1),
+    'noun': (_endings(NOUN), set()),
+    'derivational': (_endings(DERIVATIONAL), set()),
+    'superlative': (_endings(SUPERLATIVE), set()),
+}
+
+
+def normalize(text):
+    """Приводит текст к нижнему регистру и заменяет «ё» на «е»."""
+    return text.casefold().replace('ё', 'е')
+
+
+def _regions(word):
+    """Начала областей RV и R2 алгоритма Snowball."""
+    rv = r1 = r2 = len(word)
+    for i, letter in enumerate(word):
+        if letter in VOWELS:
+            rv = i + 1
+            break
+    for i in range(1, len(word)):
+        if word[i - 1] in VOWELS and word[i] not in VOWELS:
+            r1 = i + 1
+            break
+    for i in range(r1 + 1, len(word)):
+        if word[i - 1] in VOWELS and word[i] not in VOWELS:
+            r2 = i + 1
+            break
+    return rv, r2
+
+
+def _cut(word, start, group):
+    """Отсекает самое длинное окончание группы, лежащее правее `start`.
+
+    Возвращает укороченное слово или None, если окончание не найдено
+    или не выполнено условие «после а/я».
+    """
+    endings, after_a = _SUFFIXES[group]
+    region = word[start:]
+    for ending in endings:
+        if region.endswith(ending):
+            stem = word[:-len(ending)]
+            if ending in after_a and not (
+                    len(stem) > start and stem[-1] in 'ая'):
+                return None
+            return stem
+    return None
+
+
+def _step_1(word, rv):
+    stem = _cut(word, rv, 'gerund')
+    if stem is not None:
+        return stem
+    word = _cut(word, rv, 'reflexive') or word
+    stem = _cut(word, rv, 'adjective')
+    if stem is not None:
+        return _cut(stem, rv, 'participle') or stem
+    for group in ('verb', 'noun'):
+        stem = _cut(word, rv, group)
+        if stem is not None:
+            return stem
+    return word
+
+
+def _step_4(word, rv):
+    stem = _cut(word, rv, 'superlative')
+    if stem is not None:
+        word = stem
+    if word[rv:].endswith('нн'):
+        return word[:-1]
+    if stem is None and word[rv:].endswith('ь'):
+        return word[:-1]
+    return word
+
+
+@functools.lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(word):
+    """Основа русского слова; слова не из кириллицы не меняются.
+
+    Слово должно быть уже нормализовано функцией `normalize`.
+    """
+    if not CYRILLIC_WORD_RE.fullmatch(word):
+        return word
+    rv, r2 = _regions(word)
+    word = _step_1(word, rv)
+    if word[rv:].endswith('и'):
+        word = word[:-1]
+    word = _cut(word, r2, 'derivational') or word
+    return _step_4(word, rv)
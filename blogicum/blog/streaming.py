@@ -0,0 +1,56 @@
+"""Потоковый рендеринг длинных страниц.
+
+Шаблон страницы рендерится целиком, но вместо строк, выведенных тегом
+`{% stream %}` (карточек постов, комментариев), в нём остаются метки.
+Такой «скелет» с шапкой и телом поста уходит посетителю сразу, а строки
+рендерятся и отдаются по одной, пока их читают из базы. Первый байт
+приходит раньше, и целиком страница в памяти не собирается.
+
+Включается настройкой `BLOG_STREAMING_PAGES` (см. `StreamingRenderMixin`).
+"""
+import re
+
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+STREAMS_KEY = 'blog_streams'
+STREAM_RE = re.compile(r'<!--blog:stream (\d+)-->')
+
+
+def stream_marker(index):
+    return mark_safe(f'<!--blog:stream {index}-->')
+
+
+def iterate_rows(items):
+    """Итератор по строкам; невычисленный QuerySet читается курсором.
+
+    Страница пагинатора отдаёт свой `object_list`, чтобы не загружать
+    его в память целиком.
+    """
+    rows = getattr(items, 'object_list', items)
+    if isinstance(rows, QuerySet) and rows._result_cache is None:
+        return rows.iterator()
+    return iter(items)
+
+
+def stream_template(template_name, context, request):
+    """Ответ, который отдаёт страницу по кускам.
+
+    Скелет рендерится сразу, поэтому ошибки шаблона вне `{% stream %}`
+    превращаются в обычный ответ 500, а не в оборванную страницу.
+    """
+    streams = []
+    content = render_to_string(
+        template_name, {**context, STREAMS_KEY: streams}, request=request)
+    parts = STREAM_RE.split(content)
+
+    def chunks():
+        for number, part in enumerate(parts):
+            if number % 2:
+                yield from streams[int(part)]()
+            elif part:
+                yield part
+
+    return StreamingHttpResponse(chunks())
@@ -0,0 +1,40 @@
+from core.jobs import task
+from django.core.management import call_command
+
+from .cache import FEED_TAG, bump_tags, category_tag, post_tag, sitemap_tag
+from .models import Post
+from .renditions import update_post_renditions
+from .sitemaps import PostSitemap, chunk_number
+
+
+def bump_post_page_tags(post_ids):
+    """Сбрасывает кэш страниц, на которых выводятся посты `post_ids`.
+
+    Нужен после `touch()`: обновление в обход `save()` не вызывает
+    сигналов, которые сбрасывают эти теги (см. blog/signals.py).
+    """
+    slugs = Post.objects.filter(pk__in=post_ids).values_list(
+        'category__slug', flat=True).distinct()
+    bump_tags(
+        FEED_TAG,
+        *(post_tag(post_id) for post_id in post_ids),
+        *(category_tag(slug) for slug in slugs if slug),
+        *{sitemap_tag(PostSitemap.section, chunk_number(post_id))
+          for post_id in post_ids},
+    )
+
+
+@task
+def build_post_renditions(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None and update_post_renditions(post):
+        bump_post_page_tags([post.pk])
+
+
+@task(max_attempts=1)
+def recount_comment_counters():
+    """Плановая сверка всех `Post.comment_count` с комментариями.
+
+    Запускается по расписанию `JOB_QUEUE_SCHEDULE`.
+    """
+    call_command('recount_comments')
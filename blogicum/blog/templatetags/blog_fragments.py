@@ -0,0 +1,98 @@
+from blog.cache import get_page_cache, post_card_key
+from blog.holes import hole_marker
+from blog.streaming import STREAMS_KEY, iterate_rows, stream_marker
+from django import template
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.safestring import SafeString, mark_safe
+
+register = template.Library()
+
+POST_CARD_TEMPLATE = 'includes/post_card.html'
+
+
+@register.simple_tag
+def post_card(post):
+    """Выводит карточку поста, рендеря её не чаще одного раза на версию.
+
+    Карточка не зависит от посетителя и страницы, поэтому одна запись
+    кэша обслуживает ленту, категории, профили и поиск для всех.
+    """
+    timeout = settings.BLOG_POST_CARD_CACHE_TIMEOUT
+    if not timeout:
+        return render_to_string(POST_CARD_TEMPLATE, {'post': post})
+    cache = get_page_cache()
+    key = post_card_key(post)
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(POST_CARD_TEMPLATE, {'post': post})
+        cache.set(key, html, timeout)
+    return mark_safe(html)
+
+
+@register.simple_tag(takes_context=True)
+def personal(context, template_name, **params):
+    """Выводит часть страницы, зависящую от посетителя.
+
+    Если страница рендерится для общего кэша (`punch_holes` в контексте),
+    вместо части остаётся метка, которую `blog.holes.fill_holes`
+    заполнит для каждого запроса. Иначе шаблон подключается как
+    `{% include %}` с параметрами тега. Шаблону стоит опираться только
+    на параметры и данные контекст-процессоров: при заполнении метки
+    остального контекста страницы у него нет.
+    """
+    if context.get('punch_holes'):
+        return hole_marker(template_name, params)
+    template = context.template.engine.get_template(template_name)
+    with context.push(**params):
+        return template.render(context)
+
+
+class StreamNode(template.Node):
+    def __init__(self, loopvar, items, nodelist, nodelist_empty):
+        self.loopvar = loopvar
+        self.items = items
+        self.nodelist = nodelist
+        self.nodelist_empty = nodelist_empty
+
+    def render_rows(self, context, items):
+        empty = True
+        for item in iterate_rows(items):
+            empty = False
+            with context.push(**{self.loopvar: item}):
+                yield self.nodelist.render(context)
+        if empty:
+            yield self.nodelist_empty.render(context)
+
+    def render(self, context):
+        items = self.items.resolve(context, ignore_failures=True) or []
+        streams = context.get(STREAMS_KEY)
+        if streams is None:
+            return SafeString(''.join(self.render_rows(context, items)))
+        # Строки рендерятся после скелета, когда контекст страницы уже
+        # закрыт, поэтому им нужна своя копия.
+        row_context = context.new(context.flatten())
+        streams.append(lambda: self.render_rows(row_context, items))
+        return stream_marker(len(streams) - 1)
+
+
+@register.tag
+def stream(parser, token):
+    """Цикл `{% stream item in items %}...{% empty %}...{% endstream %}`.
+
+    Выводит тело для каждого элемента, как `{% for %}` без `forloop`.
+    При потоковом рендеринге (см. blog/streaming.py) строки отдаются по
+    одной, после остальной страницы.
+    """
+    bits = token.split_contents()
+    if len(bits) != 4 or bits[2] != 'in':
+        raise template.TemplateSyntaxError(
+            f'Ожидается {{% {bits[0]} item in items %}}.')
+    nodelist = parser.parse(('empty', 'endstream'))
+    if parser.next_token().contents == 'empty':
+        nodelist_empty = parser.parse(('endstream',))
+        parser.delete_first_token()
+    else:
+        nodelist_empty = template.NodeList()
+    return StreamNode(
+        bits[1], parser.compile_filter(bits[3]), nodelist, nodelist_empty)
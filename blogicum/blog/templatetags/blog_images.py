@@ -0,0 +1,34 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+register = template.Library()
+
+DEFAULT_SIZES = '(max-width: 640px) 100vw, 640px'
+
+
+def _srcset(entries):
+    return ', '.join(
+        f'{default_storage.url(name)} {width}w' for width, name in entries)
+
+
+@register.simple_tag
+def responsive_image(image, renditions, css_class='', sizes=DEFAULT_SIZES):
+    """Выводит `<picture>` с WebP и уменьшенными копиями изображения.
+
+    Если копии ещё не построены или устарели, выводит обычный `<img>`
+    с оригиналом.
+    """
+    if not renditions or renditions.get('source') != image.name:
+        return format_html(
+            '<img class="{}" src="{}">', css_class, image.url)
+
+    fallback = renditions['fallback'] + [[renditions['width'], image.name]]
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img class="{}" src="{}" srcset="{}" sizes="{}" loading="lazy">'
+        '</picture>',
+        _srcset(renditions['webp']), sizes,
+        css_class, image.url, _srcset(fallback), sizes,
+    )
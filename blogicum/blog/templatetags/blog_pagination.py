@@ -0,0 +1,18 @@
+from blog.constants import PAGINATOR_ON_EACH_SIDE, PAGINATOR_ON_ENDS
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_window(page):
+    """Номера страниц вокруг текущей и по краям, «…» на месте пропусков.
+
+    Вместо ссылки на каждую страницу: при сотне тысяч постов их были бы
+    тысячи.
+    """
+    return page.paginator.get_elided_page_range(
+        page.number,
+        on_each_side=PAGINATOR_ON_EACH_SIDE,
+        on_ends=PAGINATOR_ON_ENDS,
+    )
@@ -1,21 +1,42 @@
 from blog.views import (CategoryPostListView, CommentCreateView,
                         CommentDeleteView, CommentEditView, IndexView,
                         PostCreateView, PostDeleteView, PostDetailView,
-                        PostUpdateView, ProfileUpdateView, ProfileView)
+                        PostUpdateView, ProfileUpdateView, ProfileView,
+                        SearchView)
 from django.urls import path
 
+from .async_views import read_only_view
+from .feeds import (CategoryAtomFeed, CategoryFeed, IndexAtomFeed, IndexFeed,
+                    ProfileAtomFeed, ProfileFeed)
+from .sitemaps import sitemap_index, sitemap_section
+
 app_name = 'blog'
 
 
 urlpatterns = [
-    path('', IndexView.as_view(), name='index'),
-    path('category/<slug:category_slug>/', CategoryPostListView.as_view(),
-         name='category_posts'),
+    path('', read_only_view(IndexView), name='index'),
+    path('feed/', IndexFeed(), name='index_feed'),
+    path('feed/atom/', IndexAtomFeed(), name='index_atom_feed'),
+    path('category/<slug:category_slug>/',
+         read_only_view(CategoryPostListView), name='category_posts'),
+    path('category/<slug:category_slug>/feed/', CategoryFeed(),
+         name='category_feed'),
+    path('category/<slug:category_slug>/feed/atom/', CategoryAtomFeed(),
+         name='category_atom_feed'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('sitemap.xml', sitemap_index, name='sitemap'),
+    path('sitemap-<slug:section>.xml', sitemap_section,
+         name='sitemap_section'),
     path('profile/edit/', ProfileUpdateView.as_view(), name='edit_profile'),
-    path('profile/<str:username>/', ProfileView.as_view(), name='profile'),
+    path('profile/<str:username>/', read_only_view(ProfileView),
+         name='profile'),
+    path('profile/<str:username>/feed/', ProfileFeed(), name='profile_feed'),
+    path('profile/<str:username>/feed/atom/', ProfileAtomFeed(),
+         name='profile_atom_feed'),
     path('posts/create/', PostCreateView.as_view(), name='create_post'),
     path('posts/<int:pk>/edit/', PostUpdateView.as_view(), name='edit_post'),
-    path('posts/<int:id>/', PostDetailView.as_view(), name='post_detail'),
+    path('posts/<int:id>/', read_only_view(PostDetailView),
+         name='post_detail'),
     path('posts/<int:id>/delete/', PostDeleteView.as_view(),
          name='delete_post'),
     path('posts/<int:post_id>/comment/', CommentCreateView.as_view(),
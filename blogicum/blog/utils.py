@@ -0,0 +1,45 @@
+import math
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import Post
+
+
+def published_now():
+    """Момент «сейчас» для фильтров видимости публикаций.
+
+    Время округляется вверх до границы корзины
+    `BLOG_PUBLISHED_NOW_BUCKET` секунд, поэтому в пределах корзины все
+    запросы строят одинаковый SQL и их результаты можно кэшировать.
+    Отложенная публикация становится видна не позже своего `pub_date`
+    и не раньше, чем за одну корзину до него.
+    """
+    now = timezone.now()
+    bucket = settings.BLOG_PUBLISHED_NOW_BUCKET
+    if not bucket:
+        return now
+    timestamp = now.timestamp()
+    ceiling = -(-timestamp // bucket) * bucket
+    return datetime.fromtimestamp(ceiling, tz=dt_timezone.utc)
+
+
+def seconds_until_next_publication():
+    """Через сколько секунд `published_now()` откроет отложенную публикацию.
+
+    None — отложенных публикаций нет. Сигналов в момент наступления
+    `pub_date` не бывает, поэтому кэш страниц не хранит их дольше.
+    """
+    pub_date = Post.objects.filter(
+        is_published=True, pub_date__gt=published_now(),
+    ).aggregate(next=Min('pub_date'))['next']
+    if pub_date is None:
+        return None
+    opens_at = pub_date.timestamp()
+    bucket = settings.BLOG_PUBLISHED_NOW_BUCKET
+    if bucket:
+        # Начало корзины, в конце которой лежит pub_date.
+        opens_at = (-(-opens_at // bucket) - 1) * bucket
+    return max(1, math.ceil(opens_at - timezone.now().timestamp()))
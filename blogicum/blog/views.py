@@ -1,18 +1,25 @@
 from blog.models import Category, Comment, Post
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.contrib.auth.models import User
-from django.db.models import Count
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
-from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.http import urlencode
 from django.utils.timezone import now
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
                                   UpdateView)
 
-from .constants import PAGINATION_SIZE
+from .cache import CATALOG_TAG, category_tag, post_tag
+from .constants import COMMENTS_PAGINATION_SIZE, PAGINATION_SIZE
 from .forms import CommentForm, PostForm, UserProfileForm
-from .mixins import MyLoginRequiredMixin
+from .mixins import (ConditionalGetMixin, KeysetPaginationMixin,
+                     MemoizedObjectMixin, MyLoginRequiredMixin,
+                     ReplicaReadMixin, SharedPageCacheMixin,
+                     StreamingRenderMixin)
+from .pagination import KeysetPaginator
+from .search import search_posts
+from .utils import published_now
 
 
 def get_filtered_posts(queryset):
@@ -20,7 +27,7 @@ def get_filtered_posts(queryset):
         queryset.select_related('author', 'category', 'location')
         .filter(
             is_published=True,
-            pub_date__lte=timezone.now(),
+            pub_date__lte=published_now(),
             category__is_published=True,
         )
     )
@@ -44,7 +51,8 @@ class PostCreateView(MyLoginRequiredMixin, CreateView):
         return post.author == self.request.user
 
 
-class PostUpdateView(MyLoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class PostUpdateView(MyLoginRequiredMixin, UserPassesTestMixin,
+                     MemoizedObjectMixin, UpdateView):
     model = Post
     form_class = PostForm
     template_name = 'blog/create.html'
@@ -60,78 +68,102 @@ class PostUpdateView(MyLoginRequiredMixin, UserPassesTestMixin, UpdateView):
 
     def test_func(self):
         post = self.get_object()
-        return post.author == self.request.user
+        return post.author_id == self.request.user.id
 
     def handle_no_permission(self):
         post = self.get_object()
         return redirect('blog:post_detail', id=post.id)
 
 
-class PostDeleteView(MyLoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class PostDeleteView(MyLoginRequiredMixin, UserPassesTestMixin,
+                     MemoizedObjectMixin, DeleteView):
     model = Post
     template_name = 'blog/create.html'
     context_object_name = 'post'
+    pk_url_kwarg = 'id'
 
     def get_success_url(self):
         return reverse_lazy('blog:index')
 
-    def get_object(self, queryset=None):
-        return get_object_or_404(Post, id=self.kwargs['id'])
-
     def test_func(self):
         post = self.get_object()
-        return post.author == self.request.user
+        return post.author_id == self.request.user.id
 
 
-class ProfileView(ListView):
+class ProfileView(ReplicaReadMixin, ConditionalGetMixin, MemoizedObjectMixin,
+                  KeysetPaginationMixin, StreamingRenderMixin, ListView):
     model = Post
     template_name = 'blog/profile.html'
-    context_object_name = 'page_obj'
+    context_object_name = 'post_list'
     paginate_by = PAGINATION_SIZE
 
+    def lookup_object(self, queryset=None):
+        return get_object_or_404(User, username=self.kwargs.get('username'))
+
+    def get_validator_data(self):
+        profile = self.get_object()
+        return (
+            profile.username, profile.get_full_name(), profile.is_staff,
+            profile.date_joined, self.get_page_versions(),
+        )
+
     def get_queryset(self):
-        username = self.kwargs.get('username')
-        user = get_object_or_404(User, username=username)
         return (
-            Post.objects.filter(author=user)
-            .annotate(comment_count=Count('comments'))
-            .order_by('-pub_date')
+            Post.objects.filter(author__username=self.kwargs['username'])
+            .select_related('author', 'category', 'location')
+            .order_by('-pub_date', '-id')
         )
 
+    def get_independent_queries(self):
+        return [self.get_object, lambda: self.object_count]
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile'] = get_object_or_404(
-            User, username=self.kwargs.get('username'))
+        context['profile'] = self.get_object()
         context['now'] = now()
         return context
 
 
-class CategoryPostListView(ListView):
+class CategoryPostListView(ReplicaReadMixin, SharedPageCacheMixin,
+                           ConditionalGetMixin, MemoizedObjectMixin,
+                           KeysetPaginationMixin, StreamingRenderMixin,
+                           ListView):
     model = Post
     template_name = 'blog/category.html'
     context_object_name = 'post_list'
     paginate_by = PAGINATION_SIZE
 
-    def get_queryset(self):
-        category_slug = self.kwargs.get('category_slug')
-        category = get_object_or_404(Category, slug=category_slug,
-                                     is_published=True)
+    def get_page_cache_tags(self):
+        return [category_tag(self.kwargs['category_slug']), CATALOG_TAG]
+
+    def lookup_object(self, queryset=None):
+        return get_object_or_404(
+            Category, slug=self.kwargs.get('category_slug'),
+            is_published=True)
+
+    def get_validator_data(self):
+        category = self.get_object()
+        return (
+            category.title, category.description, self.get_page_versions())
 
+    def get_queryset(self):
         return (
-            category.posts.select_related('author', 'category', 'location')
+            Post.objects
+            .select_related('author', 'category', 'location')
             .filter(
+                category__slug=self.kwargs['category_slug'],
                 is_published=True,
-                pub_date__lte=timezone.now()
+                pub_date__lte=published_now()
             )
-            .annotate(comment_count=Count('comments'))
-            .order_by('-pub_date')
+            .order_by('-pub_date', '-id')
         )
 
+    def get_independent_queries(self):
+        return [self.get_object, lambda: self.object_count]
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['category'] = get_object_or_404(
-            Category,
-            slug=self.kwargs.get('category_slug'))
+        context['category'] = self.get_object()
         return context
 
 
@@ -151,23 +183,91 @@ class ProfileUpdateView(MyLoginRequiredMixin, UserPassesTestMixin, UpdateView):
                             kwargs={'username': self.request.user.username})
 
 
-class IndexView(ListView):
+class IndexView(ReplicaReadMixin, SharedPageCacheMixin, ConditionalGetMixin,
+                KeysetPaginationMixin, StreamingRenderMixin, ListView):
     model = Post
     template_name = 'blog/index.html'
     context_object_name = 'post_list'
     paginate_by = PAGINATION_SIZE
 
+    def get_validator_data(self):
+        return self.get_page_versions()
+
     def get_queryset(self):
-        return get_filtered_posts(Post.objects.all()).annotate(
-            comment_count=Count("comments")).order_by('-pub_date')
+        return get_filtered_posts(Post.objects.all()).order_by(
+            '-pub_date', '-id')
+
+    def get_independent_queries(self):
+        # Для `?page=N` число постов считает `validator_data` (см.
+        # `get_page_versions`): отдельный запрос посчитал бы его ещё раз.
+        return [lambda: self.validator_data]
 
 
-class PostDetailView(MyLoginRequiredMixin, DetailView):
+class SearchView(StreamingRenderMixin, ListView):
+    model = Post
+    template_name = 'blog/search.html'
+    context_object_name = 'post_list'
+    paginate_by = PAGINATION_SIZE
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return search_posts(
+            get_filtered_posts(Post.objects.all()), self.get_search_query())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_search_query()
+        context['query'] = query
+        context['pagination_query'] = urlencode({'q': query}) + '&'
+        return context
+
+
+class PostDetailView(MyLoginRequiredMixin, ReplicaReadMixin,
+                     SharedPageCacheMixin, ConditionalGetMixin,
+                     MemoizedObjectMixin, StreamingRenderMixin, DetailView):
     model = Post
     template_name = 'blog/detail.html'
     context_object_name = 'post'
 
-    def get_object(self, queryset=None):
+    def get_page_cache_tags(self):
+        return [post_tag(self.kwargs['id']), CATALOG_TAG]
+
+    def get_validator_data(self):
+        row = Post.objects.filter(pk=self.kwargs['id']).values_list(
+            'updated_at', 'author_id', 'is_published', 'pub_date',
+            'category__is_published',
+        ).first()
+        if row is None:
+            return None
+        updated_at, author_id, is_published, pub_date, category_shown = row
+        visible = (
+            is_published and category_shown and pub_date <= published_now())
+        if not visible and author_id != self.request.user.pk:
+            return None
+        return updated_at, visible
+
+    def get_last_modified(self):
+        return self.validator_data and self.validator_data[0]
+
+    def can_share_page(self):
+        # Неопубликованный пост видит только автор.
+        return bool(self.validator_data and self.validator_data[1])
+
+    def get_hole_context(self):
+        return {'form': CommentForm()}
+
+    def get_independent_queries(self):
+        if not self.request.user.is_authenticated:
+            return []
+        return [
+            lambda: self.validator_data,
+            self.get_object,
+            lambda: self.comments_page,
+        ]
+
+    def lookup_object(self, queryset=None):
         post = get_object_or_404(
             Post.objects.select_related('author', 'category', 'location'),
             id=self.kwargs['id']
@@ -175,16 +275,30 @@ class PostDetailView(MyLoginRequiredMixin, DetailView):
 
         if not (post.category.is_published
                 and post.is_published
-                and post.pub_date <= timezone.now()) and (
+                and post.pub_date <= published_now()) and (
                     post.author != self.request.user):
             raise Http404('Post not found')
 
         return post
 
+    @cached_property
+    def comments_page(self):
+        return KeysetPaginator(
+            Comment.objects.filter(post_id=self.kwargs['id'],
+                                   is_published=True)
+            .select_related('author'),
+            COMMENTS_PAGINATION_SIZE,
+            field='created_at',
+            descending=False,
+        ).page(
+            after=self.request.GET.get('comments_after'),
+            before=self.request.GET.get('comments_before'),
+        )
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.all()
+        context['comments'] = self.comments_page
         return context
 
 
@@ -202,35 +316,33 @@ class CommentCreateView(MyLoginRequiredMixin, CreateView):
                                      kwargs={'id': post.id}))
 
 
-class CommentEditView(MyLoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class CommentEditView(MyLoginRequiredMixin, UserPassesTestMixin,
+                      MemoizedObjectMixin, UpdateView):
     model = Comment
     form_class = CommentForm
     template_name = 'blog/comment.html'
+    pk_url_kwarg = 'id'
 
     def get_success_url(self):
         return reverse_lazy('blog:post_detail', kwargs={
-            'id': self.object.post.id})
-
-    def get_object(self, queryset=None):
-        return get_object_or_404(Comment, id=self.kwargs['id'])
+            'id': self.object.post_id})
 
     def test_func(self):
         comment = self.get_object()
-        return self.request.user == comment.author
+        return comment.author_id == self.request.user.id
 
 
-class CommentDeleteView(MyLoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class CommentDeleteView(MyLoginRequiredMixin, UserPassesTestMixin,
+                        MemoizedObjectMixin, DeleteView):
     model = Comment
     template_name = 'blog/comment.html'
     context_object_name = 'comment'
+    pk_url_kwarg = 'id'
 
     def get_success_url(self):
         return reverse_lazy('blog:post_detail', kwargs={
-            'id': self.object.post.id})
-
-    def get_object(self, queryset=None):
-        return get_object_or_404(Comment, id=self.kwargs['id'])
+            'id': self.object.post_id})
 
     def test_func(self):
         comment = self.get_object()
-        return self.request.user == comment.author
+        return comment.author_id == self.request.user.id
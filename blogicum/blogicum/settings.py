@@ -14,22 +14,42 @@ import mimetypes
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 mimetypes.add_type("application/javascript", ".js", True)
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
-# Quick-start development settings - unsuitable for production
+# Профиль настроек, выбирается переменной окружения BLOGICUM_PROFILE:
+# 'dev' — отладка и debug_toolbar; 'test' — без отладки и debug_toolbar,
+#   с быстрым хешированием паролей;
+# 'prod' — как 'test', но с кэшем скомпилированных шаблонов, статикой с
+#   хешами в именах файлов (нужен `manage.py collectstatic`) и секретным
+#   ключом и адресами сайта из окружения.
 # See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
+PROFILES = ('dev', 'test', 'prod')
+PROFILE = os.environ.get('BLOGICUM_PROFILE', 'dev')
+if PROFILE not in PROFILES:
+    raise ImproperlyConfigured(
+        f'BLOGICUM_PROFILE должен быть одним из {PROFILES}, а не {PROFILE!r}.')
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-vvy(xq4iakk#59-!x7rlx@s_b8lh!=*ap(8)kcv&mao#xkzphi'
+if PROFILE == 'prod':
+    SECRET_KEY = os.environ.get('BLOGICUM_SECRET_KEY')
+    if not SECRET_KEY:
+        raise ImproperlyConfigured(
+            'В профиле prod задайте секретный ключ в BLOGICUM_SECRET_KEY.')
+else:
+    SECRET_KEY = 'django-insecure-vvy(xq4iakk#59-!x7rlx@s_b8lh!=*ap(8)kcv&mao#xkzphi'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = PROFILE == 'dev'
 
 ALLOWED_HOSTS = ['localhost', '127.0.0.1']
+if os.environ.get('BLOGICUM_ALLOWED_HOSTS'):
+    ALLOWED_HOSTS = os.environ['BLOGICUM_ALLOWED_HOSTS'].split(',')
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
@@ -53,19 +73,27 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'debug_toolbar',
+    'django.contrib.sitemaps',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.StickyPrimaryMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+
+# debug_toolbar только для разработки: импорт его панелей замедляет запуск,
+# а промежуточный слой — каждый запрос, даже когда панель не показывается.
+if PROFILE == 'dev':
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.middleware.common.CommonMiddleware') + 1,
+        'debug_toolbar.middleware.DebugToolbarMiddleware')
 INTERNAL_IPS = [
     '127.0.0.1',
     'localhost',
@@ -87,6 +115,17 @@ TEMPLATES = [
         },
     },
 ]
+# Скомпилированные шаблоны кэшируются в памяти процесса, и правки шаблонов
+# видны только после перезапуска. Без DEBUG Django кэширует их и сам;
+# здесь загрузчики перечислены явно, чтобы кэш не зависел от DEBUG.
+if PROFILE == 'prod':
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
 
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
@@ -98,7 +137,180 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Соединение переживает запрос, поэтому прагмы SQLITE_PRAGMAS
+        # выполняются один раз на соединение, а не на каждый запрос.
+        'CONN_MAX_AGE': int(os.environ.get('BLOGICUM_CONN_MAX_AGE', 600)),
+    }
+}
+
+# Прагмы, которые выполняются на каждом новом соединении с SQLite (см.
+# core/signals.py). Профиль выбирается переменной окружения
+# BLOGICUM_SQLITE_PROFILE:
+# 'tuned' — журнал WAL (читатели не ждут писателей), synchronous=NORMAL
+#   (в режиме WAL не теряет целостность, только последние транзакции при
+#   сбое питания), 64 МБ кэша страниц, 256 МБ отображения файла в память
+#   и ожидание блокировки до 5 секунд вместо мгновенной ошибки;
+# 'default' — значения SQLite по умолчанию; journal_mode хранится в
+#   файле базы, поэтому возвращается явно.
+SQLITE_PROFILES = {
+    'default': {
+        'journal_mode': 'delete',
+        'synchronous': 'full',
+    },
+    'tuned': {
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        'cache_size': -64 * 1024,
+        'mmap_size': 256 * 1024 * 1024,
+        'busy_timeout': 5000,
+        'temp_store': 'memory',
+    },
+}
+SQLITE_PRAGMAS = SQLITE_PROFILES[
+    os.environ.get('BLOGICUM_SQLITE_PROFILE', 'tuned')]
+
+# Реплики для чтения (см. core/db_router.py). Локально реплику заменяет
+# копия базы SQLite по пути из переменной окружения BLOGICUM_REPLICA_DB;
+# её обновляет `manage.py replicate_db`.
+DATABASE_REPLICAS = []
+if os.environ.get('BLOGICUM_REPLICA_DB'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['BLOGICUM_REPLICA_DB'],
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICAS = ['replica']
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+# Сколько секунд после записи посетитель читает только с основной базы:
+# должно быть больше отставания реплик.
+DATABASE_REPLICA_STICKY_SECONDS = 10
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum',
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum-sessions',
+    },
+}
+
+# Общий для процессов сервера кэш: BLOGICUM_CACHE_BACKEND — класс бэкенда
+# Django (например, django.core.cache.backends.memcached.PyMemcacheCache),
+# BLOGICUM_CACHE_LOCATION — его адрес. Сессии хранятся в нём же, но под
+# своим префиксом ключей.
+if os.environ.get('BLOGICUM_CACHE_BACKEND'):
+    for alias in CACHES:
+        CACHES[alias] = {
+            'BACKEND': os.environ['BLOGICUM_CACHE_BACKEND'],
+            'LOCATION': os.environ.get('BLOGICUM_CACHE_LOCATION', ''),
+            'KEY_PREFIX': alias,
+        }
+
+# Кэш сессий в файлах вместо памяти процесса: общий для нескольких
+# процессов сервера на одной машине и переживает их перезапуск.
+if os.environ.get('BLOGICUM_SESSION_CACHE_DIR'):
+    CACHES['sessions'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['BLOGICUM_SESSION_CACHE_DIR'],
+    }
+
+# Кэш в памяти процесса не виден другим процессам сервера: сброс версий
+# тегов страниц (см. blog/cache.py) и выход из аккаунта до них не доходят.
+# Поэтому в prod все кэши должны быть общими.
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+if PROFILE == 'prod':
+    local_caches = [
+        alias for alias, cache in CACHES.items()
+        if cache['BACKEND'] in PROCESS_LOCAL_CACHES]
+    if local_caches:
+        raise ImproperlyConfigured(
+            f'В профиле prod кэши {local_caches} должны быть общими для '
+            'процессов: задайте BLOGICUM_CACHE_BACKEND.')
+
+# Хранилище сессий, выбирается переменной окружения BLOGICUM_SESSION_STORE:
+# 'db' — каждый запрос читает таблицу django_session; 'cached_db' — сессия
+# читается из кэша 'sessions', а в базу только записывается; 'signed_cookies'
+# — данные сессии хранятся в подписанной cookie и сервер их не хранит вовсе
+# (выход из аккаунта на одном устройстве не отзывает cookie на других).
+# 'cached_db' годится, только если кэш 'sessions' общий для всех процессов
+# сервера: иначе выход из аккаунта сбрасывает сессию лишь в процессе,
+# обработавшем запрос, а остальные принимают её до истечения. Поэтому по
+# умолчанию он выбирается только для общего кэша.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_CACHE_SHARED = CACHES['sessions']['BACKEND'] not in PROCESS_LOCAL_CACHES
+SESSION_STORE = os.environ.get(
+    'BLOGICUM_SESSION_STORE', 'cached_db' if SESSION_CACHE_SHARED else 'db')
+SESSION_ENGINE = SESSION_ENGINES[SESSION_STORE]
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Кэш страниц, общий для всех посетителей (см. blog/cache.py и blog/holes.py).
+# Таймаут 0 отключает кэширование.
+BLOG_PAGE_CACHE_ALIAS = 'default'
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 15
+
+# Кэш карточек постов в лентах, общий для всех страниц и посетителей
+# (см. тег post_card в blog/templatetags/blog_fragments.py).
+# Таймаут 0 отключает кэширование.
+BLOG_POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Шаг (в секундах), до которого округляется «сейчас» в фильтрах
+# опубликованных постов (см. blog/utils.py). 0 — без округления.
+BLOG_PUBLISHED_NOW_BUCKET = 30
+
+# Ширины уменьшенных копий изображений публикаций (см. blog/renditions.py).
+BLOG_IMAGE_RENDITION_WIDTHS = (320, 640, 960, 1280)
+BLOG_IMAGE_QUALITY = 82
+
+# Хранилище поискового индекса (см. blog/search.py): 'fts5', 'inverted'
+# или 'auto' — FTS5, если база SQLite его поддерживает.
+BLOG_SEARCH_BACKEND = 'auto'
+
+# Сколько последних публикаций отдают RSS- и Atom-ленты (см. blog/feeds.py).
+BLOG_FEED_SIZE = 50
+
+# Асинхронные варианты ленты, категорий, профилей и страниц постов
+# (см. blog/async_views.py). Имеет смысл только под ASGI-сервером.
+BLOG_ASYNC_VIEWS = os.environ.get('BLOGICUM_ASYNC_VIEWS') == '1'
+
+# Потоковая отдача ленты, категорий, профилей, поиска и страниц постов:
+# карточки и комментарии уходят посетителю по мере рендеринга (см.
+# blog/streaming.py).
+BLOG_STREAMING_PAGES = os.environ.get('BLOGICUM_STREAMING_PAGES') == '1'
+
+# Дальше скольких записей пагинатор лент не считает (см. CountLimitedPaginator
+# в blog/pagination.py): глубже листают по курсору. 0 — считать все.
+BLOG_PAGINATOR_COUNT_LIMIT = 10_000
+# Сколько секунд кэшируется число постов ленты (см. cached_count в
+# blog/cache.py). 0 — считать при каждом запросе.
+BLOG_PAGINATOR_COUNT_TIMEOUT = 60
+
+# Сколько адресов в одной части карты сайта (см. blog/sitemaps.py); части
+# нарезаются по диапазонам id, поэтому адресов бывает и меньше.
+BLOG_SITEMAP_CHUNK_SIZE = 50_000
+
+# Очередь фоновых задач (см. core/jobs.py), выбирается переменной окружения
+# BLOGICUM_JOB_QUEUE_MODE: 'database' — задачи выполняет `manage.py run_jobs`,
+# 'immediate' — сразу в процессе запроса. Вне prod по умолчанию
+# 'immediate': без запущенного воркера письма сброса пароля и копии
+# изображений не появились бы вовсе.
+JOB_QUEUE_MODE = os.environ.get(
+    'BLOGICUM_JOB_QUEUE_MODE', 'database' if PROFILE == 'prod' else 'immediate')
+JOB_QUEUE_MAX_ATTEMPTS = 5
+JOB_QUEUE_RETRY_DELAY = 30
+JOB_QUEUE_LOCK_TIMEOUT = 60 * 10
+# Плановые задачи: имя задачи → интервал в секундах между запусками. Их
+# ставит в очередь `manage.py run_jobs --schedule`.
+JOB_QUEUE_SCHEDULE = {
+    'blog.tasks.recount_comment_counters': 60 * 60 * 24,
 }
 
 
@@ -119,6 +331,10 @@ AUTH_PASSWORD_VALIDATORS = [
         'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
     },
 ]
+# Тестам стойкость хешей паролей не нужна, а PBKDF2 — самое медленное
+# место при создании пользователей и входе.
+if PROFILE == 'test':
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
 
 
 # Internationalization
@@ -141,6 +357,12 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [
     BASE_DIR / 'static_dev', ]
+STATIC_ROOT = os.environ.get('BLOGICUM_STATIC_ROOT', BASE_DIR / 'static')
+# В prod имена файлов статики содержат хеш содержимого: браузеры кэшируют
+# их навсегда и получают новый адрес при изменении файла.
+if PROFILE == 'prod':
+    STATICFILES_STORAGE = (
+        'django.contrib.staticfiles.storage.ManifestStaticFilesStorage')
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
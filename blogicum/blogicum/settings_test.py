@@ -0,0 +1,10 @@
+"""Настройки для pytest: профиль test (см. BLOGICUM_PROFILE в settings.py).
+
+pytest-django импортирует настройки раньше, чем conftest.py, поэтому
+профиль выбирается здесь, до импорта общих настроек.
+"""
+import os
+
+os.environ.setdefault('BLOGICUM_PROFILE', 'test')
+
+from .settings import *  # noqa: E402,F401,F403
@@ -0,0 +1,71 @@
+"""Чтение с реплик базы данных.
+
+Реплики перечислены в `DATABASE_REPLICAS`. Запись всегда идёт в основную
+базу `default`; чтение уходит на реплику только внутри `replica_reads()`
+— его включают представления, которые только читают данные (см.
+`blog.mixins.ReplicaReadMixin`). Остальные чтения, например проверки
+прав и формы правки, остаются на основной базе.
+
+Реплика отстаёт от основной базы, поэтому после успешного POST
+посетитель `DATABASE_REPLICA_STICKY_SECONDS` секунд читает только с
+основной базы и сразу видит свои изменения. Срок хранится в сессии (см.
+`StickyPrimaryMiddleware`).
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY_UNTIL_SESSION_KEY = '_primary_db_until'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Направляет чтения внутри блока на реплики, если они настроены."""
+    token = _replica_reads.set(bool(settings.DATABASE_REPLICAS))
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def reading_from_replica():
+    return _replica_reads.get()
+
+
+def pick_replica():
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+def stick_to_primary(request):
+    """Закрепляет посетителя за основной базой после записи."""
+    request.session[PRIMARY_UNTIL_SESSION_KEY] = (
+        time.time() + settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+
+def sticks_to_primary(request):
+    if not settings.DATABASE_REPLICAS:
+        return False
+    return request.session.get(PRIMARY_UNTIL_SESSION_KEY, 0) > time.time()
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get():
+            return pick_replica()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и в основной базе.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схему реплики получают вместе с данными основной базы.
+        return db not in settings.DATABASE_REPLICAS
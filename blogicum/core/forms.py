@@ -0,0 +1,20 @@
+from django.contrib.auth.forms import PasswordResetForm
+from django.template import loader
+
+from .tasks import send_email
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Сброс пароля, при котором письмо отправляет фоновая задача."""
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        subject = loader.render_to_string(subject_template_name, context)
+        subject = ''.join(subject.splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        html_body = None
+        if html_email_template_name is not None:
+            html_body = loader.render_to_string(
+                html_email_template_name, context)
+        send_email.delay(subject, body, from_email, [to_email], html_body)
@@ -0,0 +1,135 @@
+"""Небольшая очередь фоновых задач на базе данных.
+
+Задача — обычная функция с декоратором `@task`; её аргументы должны
+сериализоваться в JSON. `func.delay(...)` ставит задачу в очередь:
+
+* в режиме `JOB_QUEUE_MODE = 'database'` создаётся строка `Job`, которую
+  выполнит `manage.py run_jobs`;
+* в режиме `'immediate'` задача выполняется сразу, в том же процессе, —
+  это удобно для тестов и локальной разработки.
+
+Плановые задачи из `JOB_QUEUE_SCHEDULE` ставит в очередь
+`manage.py run_jobs --schedule` (см. `schedule_periodic`).
+"""
+import functools
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+
+class Task:
+    def __init__(self, func, max_attempts=None):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.name = f'{func.__module__}.{func.__name__}'
+        self.max_attempts = max_attempts
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return enqueue(self, *args, **kwargs)
+
+
+def task(func=None, *, max_attempts=None):
+    """Регистрирует функцию как фоновую задачу."""
+    if func is None:
+        return functools.partial(task, max_attempts=max_attempts)
+    return Task(func, max_attempts=max_attempts)
+
+
+def _create_job(task, args, kwargs, run_after):
+    return Job.objects.create(
+        name=task.name,
+        args=list(args),
+        kwargs=kwargs,
+        max_attempts=task.max_attempts or settings.JOB_QUEUE_MAX_ATTEMPTS,
+        run_after=run_after,
+    )
+
+
+def enqueue(task, *args, run_after=None, **kwargs):
+    if settings.JOB_QUEUE_MODE == 'immediate':
+        task(*args, **kwargs)
+        return None
+    return _create_job(task, args, kwargs, run_after or timezone.now())
+
+
+def schedule_periodic():
+    """Ставит в очередь плановые задачи, которых в ней ещё нет.
+
+    `JOB_QUEUE_SCHEDULE` сопоставляет имени задачи без аргументов
+    интервал в секундах. Задача ставится с отсрочкой на свой интервал,
+    поэтому следующий запуск случится через интервал после того, как
+    предыдущий завершился или окончательно упал. Возвращает созданные
+    задачи.
+    """
+    now = timezone.now()
+    created = []
+    for name, interval in settings.JOB_QUEUE_SCHEDULE.items():
+        if Job.objects.filter(name=name).exclude(
+                status=Job.FAILED).exists():
+            continue
+        created.append(_create_job(
+            import_string(name), [], {},
+            now + timedelta(seconds=interval)))
+    return created
+
+
+def _claimable(now):
+    stale = now - timedelta(seconds=settings.JOB_QUEUE_LOCK_TIMEOUT)
+    return (
+        Q(status=Job.QUEUED, run_after__lte=now)
+        | Q(status=Job.RUNNING, locked_at__lt=stale)
+    )
+
+
+def claim_jobs(limit):
+    """Забирает до `limit` готовых к запуску задач.
+
+    Задача считается взятой, только если условный UPDATE перевёл её в
+    `running`, поэтому несколько воркеров не выполнят одну задачу
+    дважды. Задачи, зависшие в `running` дольше
+    `JOB_QUEUE_LOCK_TIMEOUT`, забираются повторно.
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(_claimable(now)).values_list(
+        'pk', flat=True)[:limit]
+    claimed = [
+        pk for pk in candidates
+        if Job.objects.filter(_claimable(now), pk=pk).update(
+            status=Job.RUNNING, locked_at=now, attempts=F('attempts') + 1)
+    ]
+    return list(Job.objects.filter(pk__in=claimed))
+
+
+def execute(name, args, kwargs):
+    """Выполняет задачу по имени; возвращает текст ошибки или None."""
+    try:
+        import_string(name)(*args, **kwargs)
+    except Exception:
+        return traceback.format_exc()
+    return None
+
+
+def finish_job(job, error):
+    """Удаляет успешную задачу или планирует повтор с растущей паузой."""
+    if error is None:
+        job.delete()
+        return
+    job.last_error = error
+    job.locked_at = None
+    if job.attempts >= job.max_attempts:
+        job.status = Job.FAILED
+    else:
+        job.status = Job.QUEUED
+        delay = settings.JOB_QUEUE_RETRY_DELAY * 2 ** (job.attempts - 1)
+        job.run_after = timezone.now() + timedelta(seconds=delay)
+    job.save(update_fields=[
+        'status', 'run_after', 'locked_at', 'last_error'])
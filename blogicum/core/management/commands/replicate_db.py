@@ -0,0 +1,49 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+def copy_database(source, target):
+    """Копирует файловую базу SQLite `source` в `target` целиком.
+
+    Используется backup API SQLite: копия согласована, даже если в
+    основную базу в это время пишут.
+    """
+    source.ensure_connection()
+    target.ensure_connection()
+    source.connection.backup(target.connection)
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу в реплики из DATABASE_REPLICAS. Подходит '
+        'для SQLite, где настоящей репликации нет; у серверных СУБД '
+        'реплики поддерживает сама СУБД.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять копирование раз в указанное число секунд; '
+                 '0 — скопировать один раз.')
+
+    def handle(self, *args, interval, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError(
+                'Реплики не настроены: задайте BLOGICUM_REPLICA_DB.')
+        source = connections['default']
+        if source.vendor != 'sqlite':
+            raise CommandError(
+                'Копировать базу умеем только для SQLite.')
+        while True:
+            started = time.perf_counter()
+            for alias in settings.DATABASE_REPLICAS:
+                copy_database(source, connections[alias])
+            self.stdout.write(
+                f'Реплики обновлены за '
+                f'{(time.perf_counter() - started) * 1000:.0f} мс.')
+            if not interval:
+                break
+            time.sleep(interval)
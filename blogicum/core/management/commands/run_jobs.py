@@ -0,0 +1,92 @@
+import multiprocessing
+import os
+import time
+import traceback
+from concurrent.futures import (Executor, Future, ProcessPoolExecutor,
+                                as_completed)
+
+import django
+from core.jobs import claim_jobs, execute, finish_job, schedule_periodic
+from django.core.management.base import BaseCommand
+
+
+class InlineExecutor(Executor):
+    """Выполняет задачи сразу, в текущем процессе."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди в пуле процессов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=os.cpu_count() or 1,
+            help='Число процессов, выполняющих задачи; 0 — выполнять '
+                 'их в текущем процессе.')
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Сколько задач забирать из очереди за раз.')
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза в секундах, если очередь пуста.')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить все готовые задачи и завершиться.')
+        parser.add_argument(
+            '--schedule', action='store_true',
+            help='Ставить в очередь плановые задачи из JOB_QUEUE_SCHEDULE; '
+                 'достаточно одного воркера с этим ключом.')
+
+    def handle(self, *args, processes, batch_size, sleep, once, schedule,
+               **options):
+        batch_size = batch_size or max(processes, 1) * 4
+        if processes:
+            # Процессы запускаются через spawn: они не наследуют открытые
+            # соединения с базой и настраивают Django заново.
+            pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+        else:
+            pool = InlineExecutor()
+        with pool:
+            while True:
+                if schedule:
+                    self.enqueue_scheduled()
+                jobs = claim_jobs(batch_size)
+                if not jobs:
+                    if once:
+                        break
+                    time.sleep(sleep)
+                    continue
+                futures = {
+                    pool.submit(execute, job.name, job.args, job.kwargs): job
+                    for job in jobs
+                }
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        error = future.result()
+                    except Exception:
+                        error = traceback.format_exc()
+                    finish_job(job, error)
+                    if error is None:
+                        self.stdout.write(f'{job.name} #{job.pk}: готово')
+                    else:
+                        self.stderr.write(
+                            f'{job.name} #{job.pk}: ошибка, попытка '
+                            f'{job.attempts} из {job.max_attempts}')
+
+    def enqueue_scheduled(self):
+        for job in schedule_periodic():
+            self.stdout.write(
+                f'{job.name} #{job.pk}: запланирована на '
+                f'{job.run_after:%Y-%m-%d %H:%M:%S}')
@@ -0,0 +1,18 @@
+from django.conf import settings
+
+from .db_router import stick_to_primary
+
+
+class StickyPrimaryMiddleware:
+    """После успешной записи закрепляет посетителя за основной базой."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (settings.DATABASE_REPLICAS
+                and request.method not in ('GET', 'HEAD', 'OPTIONS')
+                and response.status_code < 400):
+            stick_to_primary(request)
+        return response
@@ -32,6 +32,20 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def run_jobs_immediately(settings):
+    settings.JOB_QUEUE_MODE = "immediate"
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    from django.core.cache import caches
+
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -354,6 +368,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
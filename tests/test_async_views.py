@@ -0,0 +1,134 @@
+import asyncio
+import importlib
+import time
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from blog.async_views import AsyncPageView, in_thread
+from blog.views import ProfileView
+from django.test import AsyncClient, RequestFactory
+from django.urls import clear_url_caches, resolve
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def _reload_urls():
+    clear_url_caches()
+    for module in ("blog.urls", "blogicum.urls"):
+        importlib.reload(importlib.import_module(module))
+
+
+@pytest.fixture
+def async_views(settings):
+    settings.BLOG_ASYNC_VIEWS = True
+    _reload_urls()
+    yield
+    settings.BLOG_ASYNC_VIEWS = False
+    _reload_urls()
+
+
+def _get(client, url):
+    async def fetch():
+        return await client.get(url)
+
+    return async_to_sync(fetch)()
+
+
+@pytest.mark.parametrize("url", [
+    "/",
+    "/category/{post.category.slug}/",
+    "/profile/{post.author.username}/",
+    "/posts/{post.id}/",
+])
+def test_read_only_pages_served_async(
+        async_views, user, post_with_published_location, url):
+    post = post_with_published_location
+    url = url.format(post=post)
+    assert asyncio.iscoroutinefunction(resolve(url).func), (
+        "Убедитесь, что при BLOG_ASYNC_VIEWS страницы только для чтения "
+        "обслуживаются асинхронными представлениями."
+    )
+    client = AsyncClient()
+    client.force_login(user)
+    response = _get(client, url)
+    assert response.status_code == 200
+    assert post.title in response.content.decode()
+    assert user.username in response.content.decode()
+
+
+def test_async_index_counts_posts_once(
+        async_views, settings, post_with_published_location):
+    settings.BLOG_PAGINATOR_COUNT_TIMEOUT = 0
+    with mock.patch(
+            "blog.mixins.count_up_to",
+            wraps=importlib.import_module("blog.mixins").count_up_to,
+    ) as count_up_to:
+        assert _get(AsyncClient(), "/?page=1").status_code == 200
+    assert count_up_to.call_count == 1, (
+        "Убедитесь, что асинхронная лента считает посты один раз."
+    )
+
+
+def test_async_detail_keeps_access_checks(
+        async_views, another_user, post_with_published_location):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    assert _get(AsyncClient(), url).status_code == 302, (
+        "Убедитесь, что асинхронная страница поста по-прежнему требует "
+        "входа."
+    )
+    post.is_published = False
+    post.save()
+    client = AsyncClient()
+    client.force_login(another_user)
+    assert _get(client, url).status_code == 404
+    assert _get(client, "/category/missing/").status_code == 404
+
+
+def test_async_detail_shows_comments(
+        async_views, mixer, user, post_with_published_location):
+    post = post_with_published_location
+    mixer.blend("blog.Comment", post=post, text="Асинхронный комментарий",
+                is_published=True)
+    client = AsyncClient()
+    client.force_login(user)
+    content = _get(client, f"/posts/{post.id}/").content.decode()
+    assert "Асинхронный комментарий" in content
+
+
+def test_async_streamed_page(
+        async_views, settings, user, post_with_published_location):
+    settings.BLOG_STREAMING_PAGES = True
+    client = AsyncClient()
+    client.force_login(user)
+    response = _get(client, f"/posts/{post_with_published_location.id}/")
+    assert response.streaming
+    page = b"".join(response.streaming_content).decode()
+    assert post_with_published_location.title in page
+    assert "blog:hole" not in page
+
+
+def test_parallel_queries_look_up_object_once(async_views, user):
+    page = ProfileView()
+    page.setup(RequestFactory().get("/"), username=user.username)
+    lookup = ProfileView.lookup_object
+
+    def slow_lookup(view, queryset=None):
+        time.sleep(0.05)
+        return lookup(view, queryset)
+
+    async def fan_out():
+        await asyncio.gather(*(
+            in_thread(AsyncPageView.run_query, page, page.get_object)
+            for _ in range(4)))
+
+    with mock.patch.object(
+            ProfileView, "lookup_object", autospec=True,
+            side_effect=slow_lookup) as lookup_object:
+        async_to_sync(fan_out)()
+    assert lookup_object.call_count == 1, (
+        "Убедитесь, что объект страницы ищется один раз, даже если его "
+        "одновременно запрашивают несколько потоков."
+    )
+    assert page.get_object() == user
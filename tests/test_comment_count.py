@@ -0,0 +1,59 @@
+import pytest
+from blog.models import Comment, Post
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _stored_count(post):
+    return Post.objects.values_list(
+        "comment_count", flat=True).get(pk=post.pk)
+
+
+def test_counter_follows_comment_changes(
+        mixer, user, post_with_published_location, post_of_another_author):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(Comment, post=post, author=user)
+    assert _stored_count(post) == 3, (
+        "Убедитесь, что `comment_count` растёт при создании комментариев."
+    )
+
+    comments[0].is_published = False
+    comments[0].save()
+    assert _stored_count(post) == 2, (
+        "Убедитесь, что снятый с публикации комментарий не учитывается."
+    )
+
+    comments[1].post = post_of_another_author
+    comments[1].save()
+    assert _stored_count(post) == 1
+    assert _stored_count(post_of_another_author) == 1
+
+    comments[2].delete()
+    assert _stored_count(post) == 0, (
+        "Убедитесь, что `comment_count` уменьшается при удалении комментария."
+    )
+
+
+def test_feed_does_not_group_by_comments(
+        user_client, many_posts_with_published_locations):
+    with CaptureQueriesContext(connection) as ctx:
+        user_client.get("/")
+    assert not any("GROUP BY" in q["sql"] for q in ctx.captured_queries), (
+        "Убедитесь, что лента читает сохранённый `comment_count`, "
+        "а не считает комментарии через GROUP BY."
+    )
+
+
+def test_recount_command(mixer, user, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(2).blend(Comment, post=post, author=user)
+    Post.objects.filter(pk=post.pk).update(comment_count=7)
+
+    with pytest.raises(CommandError):
+        call_command("recount_comments", "--check")
+    call_command("recount_comments", "--batch-size", "1")
+    assert _stored_count(post) == 2
+    call_command("recount_comments", "--check")
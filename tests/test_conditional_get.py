@@ -0,0 +1,87 @@
+import pytest
+from blog.models import Comment, Post
+from django.utils.http import http_date
+
+pytestmark = [pytest.mark.django_db]
+
+# Сессия по умолчанию хранится в базе (SESSION_ENGINE = db), поэтому
+# каждый запрос авторизованного пользователя читает сессию и пользователя.
+AUTH_QUERIES = 2
+
+
+def _revalidate(client, url, response):
+    return client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+
+def test_detail_not_modified_without_rendering(
+        django_assert_num_queries, settings, user_client,
+        post_with_published_location):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    url = f"/posts/{post_with_published_location.id}/"
+    first = user_client.get(url)
+    assert first.status_code == 200
+    assert first["ETag"].startswith('W/"')
+    assert "Last-Modified" in first
+
+    with django_assert_num_queries(AUTH_QUERIES + 1):
+        second = _revalidate(user_client, url, first)
+    assert second.status_code == 304, (
+        "Убедитесь, что неизменившаяся страница поста отдаётся кодом 304."
+    )
+
+    since = user_client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(
+        post_with_published_location.updated_at.timestamp() + 1))
+    assert since.status_code == 304
+
+
+@pytest.mark.parametrize("change", [
+    lambda post, user: Post.objects.filter(pk=post.pk).get().save(),
+    lambda post, user: Comment.objects.create(
+        post=post, author=user, text="Комментарий"),
+    lambda post, user: post.location.save(),
+    lambda post, user: post.author.save(),
+])
+def test_detail_etag_follows_changes(
+        user_client, user, post_with_published_location, change):
+    url = f"/posts/{post_with_published_location.id}/"
+    first = user_client.get(url)
+    change(post_with_published_location, user)
+    assert _revalidate(user_client, url, first).status_code == 200
+
+
+def test_etag_depends_on_user(
+        user_client, another_user_client, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/"
+    own = user_client.get(url)
+    assert _revalidate(another_user_client, url, own).status_code == 200
+
+
+@pytest.mark.parametrize("url_template", [
+    "/",
+    "/?page=1",
+    "/category/{post.category.slug}/",
+    "/profile/{post.author.username}/",
+])
+def test_feeds_not_modified_until_posts_change(
+        user_client, mixer, post_with_published_location, url_template):
+    post = post_with_published_location
+    url = url_template.format(post=post)
+    first = user_client.get(url)
+    assert first.status_code == 200
+    assert _revalidate(user_client, url, first).status_code == 304
+
+    Comment.objects.create(post=post, author=post.author, text="Новый")
+    second = _revalidate(user_client, url, first)
+    assert second.status_code == 200, (
+        "Убедитесь, что ETag ленты меняется вместе со счётчиком комментариев."
+    )
+
+    post.delete()
+    assert _revalidate(user_client, url, second).status_code == 200
+
+
+def test_cached_anonymous_page_revalidates(
+        unlogged_client, post_with_published_location):
+    first = unlogged_client.get("/")
+    second = _revalidate(unlogged_client, "/", first)
+    assert second.status_code == 304
@@ -0,0 +1,73 @@
+from unittest import mock
+
+import pytest
+from blog.models import Post
+from core import db_router
+from core.management.commands.replicate_db import copy_database
+from django.db import connections
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def replicas(settings):
+    # Реплика — та же тестовая база: проверяем маршрутизацию, а не копию.
+    settings.DATABASE_REPLICAS = ["default"]
+    with mock.patch.object(
+            db_router, "pick_replica", wraps=db_router.pick_replica) as pick:
+        yield pick
+
+
+def test_router_reads_from_replica_only_inside_block(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+    router = db_router.PrimaryReplicaRouter()
+    assert router.db_for_read(Post) is None
+    with db_router.replica_reads():
+        assert router.db_for_read(Post) == "replica"
+        assert router.db_for_write(Post) == "default"
+    assert router.db_for_read(Post) is None
+    assert router.allow_migrate("default", "blog")
+    assert not router.allow_migrate("replica", "blog")
+
+
+def test_router_ignores_block_without_replicas():
+    with db_router.replica_reads():
+        assert db_router.PrimaryReplicaRouter().db_for_read(Post) is None
+
+
+def test_feed_read_from_replica(replicas, unlogged_client,
+                                post_with_published_location):
+    assert unlogged_client.get("/").status_code == 200
+    assert replicas.called, (
+        "Убедитесь, что лента читается с реплики базы."
+    )
+
+
+def test_reads_stick_to_primary_after_write(
+        replicas, settings, user_client, post_with_published_location):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    post = post_with_published_location
+    user_client.post(
+        f"/posts/{post.id}/comment/", data={"text": "Комментарий"})
+    replicas.reset_mock()
+
+    response = user_client.get(f"/posts/{post.id}/")
+    assert "Комментарий" in response.content.decode()
+    assert not replicas.called, (
+        "Убедитесь, что после записи посетитель читает с основной базы."
+    )
+
+
+def test_replicate_copies_primary(tmp_path):
+    default = connections["default"]
+    replica = type(default)(
+        {**default.settings_dict, "NAME": str(tmp_path / "replica.sqlite3")},
+        alias="replica",
+    )
+    try:
+        copy_database(default, replica)
+        with replica.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM blog_post")
+            assert cursor.fetchone()[0] == Post.objects.count()
+    finally:
+        replica.close()
@@ -0,0 +1,57 @@
+import pytest
+from blog.constants import COMMENTS_PAGINATION_SIZE
+from blog.models import Comment
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(ctx.captured_queries), response
+
+
+def test_comment_queries_do_not_grow(
+        mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    mixer.cycle(2).blend(Comment, post=post)
+    few_queries, _ = _count_queries(user_client, url)
+
+    mixer.cycle(COMMENTS_PAGINATION_SIZE * 2).blend(Comment, post=post)
+    many_queries, response = _count_queries(user_client, url)
+
+    assert many_queries == few_queries, (
+        "Убедитесь, что авторы комментариев загружаются одним запросом "
+        "вместе с комментариями."
+    )
+    assert len(response.context["comments"]) == COMMENTS_PAGINATION_SIZE, (
+        "Убедитесь, что комментарии на странице поста разбиты на страницы."
+    )
+
+
+def test_comment_pages_cover_published_comments(
+        mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    published = mixer.cycle(COMMENTS_PAGINATION_SIZE + 5).blend(
+        Comment, post=post)
+    hidden = mixer.blend(Comment, post=post, is_published=False)
+
+    seen = []
+    url = f"/posts/{post.id}/"
+    while url:
+        page = user_client.get(url).context["comments"]
+        seen.extend(comment.id for comment in page)
+        url = (f"/posts/{post.id}/?comments_after={page.next_cursor}"
+               if page.has_next() else None)
+
+    assert seen == [comment.id for comment in published], (
+        "Убедитесь, что комментарии выводятся по времени создания и "
+        "постранично, без пропусков и повторов."
+    )
+    assert hidden.id not in seen, (
+        "Убедитесь, что снятые с публикации комментарии не отображаются."
+    )
@@ -0,0 +1,150 @@
+import time
+from datetime import timedelta
+from xml.etree import ElementTree
+
+import pytest
+from blog.models import Post
+from django.utils import timezone
+from django.utils.http import http_date
+
+pytestmark = [pytest.mark.django_db]
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+def _read(response):
+    assert response.status_code == 200
+    if response.streaming:
+        return b"".join(response.streaming_content)
+    return response.content
+
+
+def _rss_titles(client, url):
+    root = ElementTree.fromstring(_read(client.get(url)))
+    return [item.findtext("title") for item in root.iter("item")]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category, published_location):
+    now = timezone.now()
+    visible = mixer.cycle(3).blend(
+        Post, author=user, category=published_category,
+        location=published_location, is_published=True,
+        title=(f"Пост {i}" for i in range(3)),
+        pub_date=(now - timedelta(hours=i + 1) for i in range(3)))
+    mixer.blend(
+        Post, author=user, category=published_category,
+        title="Черновик", is_published=False)
+    mixer.blend(
+        Post, author=user, category=published_category,
+        title="Будущий", pub_date=now + timedelta(days=1))
+    return visible
+
+
+@pytest.mark.parametrize("url_template", [
+    "/feed/",
+    "/category/{category.slug}/feed/",
+    "/profile/{user.username}/feed/",
+])
+def test_rss_lists_visible_posts_newest_first(
+        client, user, published_category, feed_posts, url_template):
+    url = url_template.format(category=published_category, user=user)
+    response = client.get(url)
+    assert response.streaming, "Лента должна отдаваться потоком."
+    assert response["Content-Type"].startswith("application/rss+xml")
+    assert _rss_titles(client, url) == ["Пост 0", "Пост 1", "Пост 2"]
+
+
+def test_atom_feed(client, feed_posts):
+    root = ElementTree.fromstring(_read(client.get("/feed/atom/")))
+    assert root.tag == f"{ATOM}feed"
+    titles = [entry.findtext(f"{ATOM}title")
+              for entry in root.iter(f"{ATOM}entry")]
+    assert titles == ["Пост 0", "Пост 1", "Пост 2"]
+
+
+def test_feed_size_setting(client, settings, feed_posts):
+    settings.BLOG_FEED_SIZE = 2
+    assert _rss_titles(client, "/feed/") == ["Пост 0", "Пост 1"]
+
+
+def test_unknown_objects_404(client, mixer):
+    unpublished = mixer.blend("blog.Category", is_published=False)
+    assert client.get(f"/category/{unpublished.slug}/feed/").status_code == 404
+    assert client.get("/profile/nobody/feed/").status_code == 404
+
+
+def test_feed_cached_until_posts_change(
+        client, django_assert_num_queries, feed_posts):
+    first = _read(client.get("/feed/"))
+    with django_assert_num_queries(0):
+        cached = client.get("/feed/")
+    assert cached.content == first
+
+    post = feed_posts[0]
+    post.title = "Новый заголовок"
+    post.save()
+    assert _rss_titles(client, "/feed/")[0] == "Новый заголовок"
+
+
+def test_feed_conditional_get(client, feed_posts):
+    _read(client.get("/feed/"))
+    cached = client.get("/feed/")
+    assert client.get(
+        "/feed/", HTTP_IF_NONE_MATCH=cached["ETag"]).status_code == 304
+    assert "Last-Modified" not in cached
+
+
+def test_feed_conditional_get_without_cache(
+        client, settings, django_assert_num_queries, feed_posts):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    response = client.get("/feed/")
+    _read(response)
+    with django_assert_num_queries(1):
+        not_modified = client.get(
+            "/feed/", HTTP_IF_NONE_MATCH=response["ETag"])
+    assert not_modified.status_code == 304
+
+
+@pytest.mark.parametrize("page_cache", [True, False])
+def test_feed_modified_after_newest_post_removed(
+        client, settings, feed_posts, page_cache):
+    if not page_cache:
+        settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    response = client.get("/feed/")
+    _read(response)
+    newest = feed_posts[0]
+    newest.is_published = False
+    newest.save()
+
+    response = client.get(
+        "/feed/", HTTP_IF_NONE_MATCH=response["ETag"],
+        HTTP_IF_MODIFIED_SINCE=http_date(time.time()))
+    assert response.status_code == 200, (
+        "Убедитесь, что после снятия поста с публикации лента не отвечает"
+        " 304 на прежний ETag."
+    )
+    root = ElementTree.fromstring(_read(response))
+    assert newest.title not in [
+        item.findtext("title") for item in root.iter("item")]
+
+
+@pytest.mark.parametrize("page_cache", [True, False])
+def test_feed_links_follow_request_host(
+        client, settings, feed_posts, page_cache):
+    if not page_cache:
+        settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    post = feed_posts[0]
+    first = client.get("/feed/", HTTP_HOST="localhost")
+    assert f"http://localhost/posts/{post.pk}/".encode() in _read(first)
+
+    response = client.get(
+        "/feed/", HTTP_HOST="127.0.0.1", HTTP_IF_NONE_MATCH=first["ETag"])
+    assert response.status_code == 200, (
+        "Убедитесь, что ETag ленты под одним хостом не подходит другому."
+    )
+    document = _read(response)
+    assert f"http://127.0.0.1/posts/{post.pk}/".encode() in document
+    assert b"http://localhost/" not in document
+    secure = _read(client.get("/feed/", HTTP_HOST="127.0.0.1", secure=True))
+    assert f"https://127.0.0.1/posts/{post.pk}/".encode() in secure
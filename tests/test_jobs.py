@@ -0,0 +1,129 @@
+from datetime import timedelta
+
+import pytest
+from core.jobs import (Task, claim_jobs, execute, finish_job,
+                       schedule_periodic, task)
+from core.models import Job
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+pytestmark = [pytest.mark.django_db]
+
+CALLS = []
+
+
+@task(max_attempts=2)
+def remember(value):
+    CALLS.append(value)
+
+
+@task
+def explode(value):
+    raise RuntimeError("boom")
+
+
+@task
+def tick():
+    CALLS.append("tick")
+
+
+@pytest.fixture
+def database_queue(settings):
+    settings.JOB_QUEUE_MODE = "database"
+    settings.JOB_QUEUE_RETRY_DELAY = 10
+    CALLS.clear()
+    yield
+    CALLS.clear()
+
+
+def test_immediate_mode_runs_inline():
+    CALLS.clear()
+    assert remember.delay("now") is None
+    assert CALLS == ["now"]
+    assert not Job.objects.exists()
+
+
+def test_database_mode_enqueues(database_queue):
+    job = remember.delay("later")
+    assert CALLS == []
+    assert job.name == f"{__name__}.remember"
+    assert job.args == ["later"]
+    assert job.max_attempts == 2
+
+
+def test_claim_is_exclusive(database_queue):
+    remember.delay("a")
+    remember.delay("b", run_after=timezone.now() + timedelta(hours=1))
+
+    claimed = claim_jobs(10)
+    assert [job.args for job in claimed] == [["a"]]
+    assert claimed[0].status == Job.RUNNING
+    assert claimed[0].attempts == 1
+    assert claim_jobs(10) == [], (
+        "Задача, уже взятая воркером, не должна выдаваться повторно."
+    )
+
+
+def test_success_deletes_job(database_queue):
+    remember.delay("done")
+    (job,) = claim_jobs(1)
+    finish_job(job, execute(job.name, job.args, job.kwargs))
+    assert CALLS == ["done"]
+    assert not Job.objects.exists()
+
+
+def test_failure_retries_with_backoff_then_fails(database_queue):
+    job = remember.delay("x")
+    Job.objects.filter(pk=job.pk).update(name=explode.name)
+
+    (job,) = claim_jobs(1)
+    before = timezone.now()
+    finish_job(job, execute(job.name, job.args, job.kwargs))
+    job.refresh_from_db()
+    assert job.status == Job.QUEUED
+    assert "boom" in job.last_error
+    assert job.run_after >= before + timedelta(seconds=10)
+
+    Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    (job,) = claim_jobs(1)
+    finish_job(job, execute(job.name, job.args, job.kwargs))
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
+    assert job.attempts == 2
+
+
+def test_run_jobs_command_once(database_queue):
+    remember.delay("from command")
+    call_command("run_jobs", "--once", "--processes", "0")
+    assert CALLS == ["from command"]
+    assert not Job.objects.exists()
+
+
+def test_scheduled_tasks_exist():
+    for name in settings.JOB_QUEUE_SCHEDULE:
+        assert isinstance(import_string(name), Task), (
+            f"Убедитесь, что плановая задача `{name}` объявлена через `@task`."
+        )
+
+
+def test_run_jobs_schedules_periodic_task(database_queue, settings):
+    settings.JOB_QUEUE_SCHEDULE = {tick.name: 60}
+    before = timezone.now()
+    call_command("run_jobs", "--once", "--processes", "0", "--schedule")
+    (job,) = Job.objects.all()
+    assert job.name == tick.name
+    assert job.run_after >= before + timedelta(seconds=60)
+    assert CALLS == [], "Плановая задача не должна выполняться раньше срока."
+    assert schedule_periodic() == [], (
+        "Плановая задача, уже стоящая в очереди, не должна дублироваться."
+    )
+
+    Job.objects.update(run_after=timezone.now())
+    call_command("run_jobs", "--once", "--processes", "0", "--schedule")
+    assert CALLS == ["tick"]
+    (job,) = Job.objects.all()
+    assert job.run_after > timezone.now(), (
+        "Убедитесь, что после запуска плановая задача ставится снова."
+    )
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from blog.models import Comment
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _get_twice(client, url):
+    first = client.get(url)
+    second = client.get(url)
+    return first, second
+
+
+def test_feed_is_cached_for_everyone(
+        unlogged_client, user_client, user, post_with_published_location):
+    first, second = _get_twice(unlogged_client, "/")
+    assert "X-Page-Cache" not in first
+    assert second["X-Page-Cache"] == "hit", (
+        "Убедитесь, что повторный запрос к ленте обслуживается из кэша."
+    )
+    assert first.content == second.content
+
+    response = user_client.get("/")
+    assert response["X-Page-Cache"] == "hit", (
+        "Убедитесь, что страница из кэша отдаётся и авторизованным "
+        "пользователям."
+    )
+    content = response.content.decode()
+    assert user.username in content and "Выйти" in content, (
+        "Убедитесь, что шапка страницы из кэша заполняется для текущего "
+        "пользователя."
+    )
+    assert "Войти" not in content
+    assert "blog:hole" not in content
+    assert "Войти" in second.content.decode()
+
+
+def test_detail_holes_filled_per_user(
+        user_client, another_user_client, post_with_published_location):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    own = user_client.get(url)
+    other = another_user_client.get(url)
+    assert other["X-Page-Cache"] == "hit"
+
+    edit_url = f"/posts/{post.id}/edit/"
+    assert edit_url in own.content.decode()
+    assert edit_url not in other.content.decode(), (
+        "Убедитесь, что кнопки правки поста из кэша видит только автор."
+    )
+    for response in (own, other):
+        assert "csrfmiddlewaretoken" in response.content.decode(), (
+            "Убедитесь, что форма комментария на странице из кэша "
+            "получает CSRF-токен."
+        )
+
+
+def test_unpublished_post_not_shared(
+        user_client, another_user_client, post_with_published_location):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    url = f"/posts/{post.id}/"
+    assert user_client.get(url).status_code == 200
+    assert another_user_client.get(url).status_code == 404
+
+
+def test_cached_page_not_modified_per_user(
+        django_assert_num_queries, user_client, another_user_client,
+        post_with_published_location):
+    own = user_client.get("/")
+    # Из базы читаются только сессия и пользователь.
+    with django_assert_num_queries(2):
+        repeat = user_client.get("/", HTTP_IF_NONE_MATCH=own["ETag"])
+    assert repeat.status_code == 304
+    other = another_user_client.get("/", HTTP_IF_NONE_MATCH=own["ETag"])
+    assert other.status_code == 200
+
+
+def test_scheduled_post_expires_cached_feed(
+        mixer, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    mixer.blend(
+        "blog.Post", title="Отложенная публикация", category=post.category,
+        location=post.location, is_published=True,
+        pub_date=timezone.now() + timedelta(minutes=2))
+    _, cached = _get_twice(unlogged_client, "/")
+    assert cached["X-Page-Cache"] == "hit"
+    assert "Отложенная публикация" not in cached.content.decode()
+
+    later = timezone.now() + timedelta(minutes=5)
+    with mock.patch("django.utils.timezone.now", return_value=later), \
+            mock.patch("django.core.cache.backends.locmem.time.time",
+                       return_value=later.timestamp()):
+        response = unlogged_client.get("/")
+    assert "Отложенная публикация" in response.content.decode(), (
+        "Убедитесь, что кэш страницы истекает к появлению ближайшей "
+        "отложенной публикации."
+    )
+
+
+def _add_comment(post, user):
+    Comment.objects.create(post=post, author=user, text="Комментарий")
+
+
+def _edit_post(post, user):
+    post.title = "Новый заголовок"
+    post.save()
+
+
+def _edit_category(post, user):
+    post.category.save()
+
+
+def _edit_location(post, user):
+    post.location.save()
+
+
+@pytest.mark.parametrize(
+    "change", [_add_comment, _edit_post, _edit_category, _edit_location])
+def test_cache_invalidated_on_change(
+        unlogged_client, user, post_with_published_location, change):
+    post = post_with_published_location
+    urls = ["/", f"/category/{post.category.slug}/"]
+    for url in urls:
+        _get_twice(unlogged_client, url)
+
+    change(post, user)
+
+    for url in urls:
+        response = unlogged_client.get(url)
+        assert "X-Page-Cache" not in response, (
+            f"Убедитесь, что кэш страницы `{url}` сбрасывается при "
+            "изменении данных, которые на ней показаны."
+        )
+
+
+def test_other_category_stays_cached(
+        unlogged_client, post_with_published_location,
+        post_with_another_category):
+    url = f"/category/{post_with_another_category.category.slug}/"
+    _get_twice(unlogged_client, url)
+
+    post_with_published_location.save()
+
+    assert unlogged_client.get(url)["X-Page-Cache"] == "hit"
@@ -0,0 +1,158 @@
+import re
+from datetime import timedelta
+
+import pytest
+from conftest import N_PER_PAGE
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def deep_feed(mixer: Mixer, user, published_category, published_location):
+    now = timezone.now()
+    return mixer.cycle(N_PER_PAGE * 3 + 2).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        pub_date=(now - timedelta(minutes=i // 3) for i in range(100)),
+    )
+
+
+def _ids(response):
+    return [post.id for post in response.context["page_obj"]]
+
+
+@pytest.mark.parametrize("url_getter", [
+    lambda user, category: "/",
+    lambda user, category: f"/category/{category.slug}/",
+    lambda user, category: f"/profile/{user.username}/",
+])
+def test_cursor_pages_match_offset_pages(
+        user_client, user, published_category, deep_feed, url_getter):
+    url = url_getter(user, published_category)
+    offset_pages = [
+        _ids(user_client.get(f"{url}?page={n}")) for n in range(1, 5)
+    ]
+
+    cursor_pages = []
+    response = user_client.get(url)
+    while True:
+        cursor_pages.append(_ids(response))
+        next_cursor = response.context["page_obj"].next_cursor
+        if not next_cursor:
+            break
+        response = user_client.get(f"{url}?after={next_cursor}")
+        assert response.status_code == 200
+
+    assert cursor_pages == offset_pages, (
+        "Убедитесь, что переход по курсору `?after=` выдаёт те же страницы,"
+        " что и `?page=N`."
+    )
+
+    previous_cursor = response.context["page_obj"].previous_cursor
+    response = user_client.get(f"{url}?before={previous_cursor}")
+    assert _ids(response) == offset_pages[-2], (
+        "Убедитесь, что курсор `?before=` возвращает предыдущую страницу."
+    )
+
+
+def test_bad_cursor_is_404(user_client):
+    assert user_client.get("/?after=not-a-cursor").status_code == 404
+
+
+@pytest.fixture
+def long_feed(mixer: Mixer, user, published_category, published_location):
+    now = timezone.now()
+    return mixer.cycle(N_PER_PAGE * 15).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        pub_date=(now - timedelta(minutes=i) for i in range(1000)),
+    )
+
+
+def _page_links(response):
+    return re.findall(r'href="\?page=(\d+)"', response.content.decode())
+
+
+def test_paginator_shows_page_window(user_client, long_feed):
+    response = user_client.get("/?page=7")
+    assert set(_page_links(response)) == {"1", "5", "6", "8", "9", "15"}, (
+        "Убедитесь, что пагинатор показывает первую и последнюю страницы"
+        " и окно вокруг текущей, а не ссылку на каждую страницу."
+    )
+    assert "…" in response.content.decode()
+
+
+def test_paginator_stops_counting_beyond_limit(
+        settings, user_client, long_feed):
+    settings.BLOG_PAGINATOR_COUNT_LIMIT = N_PER_PAGE * 3
+    response = user_client.get("/?page=3")
+    page = response.context["page_obj"]
+    assert page.paginator.count_is_approximate
+    assert page.paginator.count == N_PER_PAGE * 3 + 1, (
+        "Убедитесь, что пагинатор не считает записи дальше порога."
+    )
+    assert "Последняя" not in response.content.decode()
+    assert page.next_cursor, (
+        "Убедитесь, что за последней посчитанной страницей ленту можно "
+        "листать дальше по курсору."
+    )
+    response = user_client.get(f"/?after={page.next_cursor}")
+    assert len(response.context["page_obj"]) == N_PER_PAGE
+    assert user_client.get("/?page=4").status_code == 404
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    return response, [
+        query["sql"] for query in ctx.captured_queries
+        if "COUNT(" in query["sql"]
+    ]
+
+
+def test_page_count_cached_until_post_changes(
+        settings, user_client, published_category, deep_feed):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    _, counts = _count_queries(user_client, "/?page=2")
+    assert len(counts) == 1
+    response, counts = _count_queries(user_client, "/?page=2")
+    assert not counts, (
+        "Убедитесь, что число постов ленты берётся из кэша."
+    )
+    total = response.context["paginator"].count
+
+    _, counts = _count_queries(
+        user_client, f"/category/{published_category.slug}/?page=2")
+    assert len(counts) == 1, (
+        "Убедитесь, что у каждой ленты своё закэшированное число постов."
+    )
+
+    post = deep_feed[0]
+    post.is_published = False
+    post.save()
+    response, counts = _count_queries(user_client, "/?page=2")
+    assert len(counts) == 1, (
+        "Убедитесь, что правка поста сбрасывает закэшированные числа."
+    )
+    assert response.context["paginator"].count == total - 1
+
+
+def test_approximate_count_kept_after_post_change(
+        settings, user_client, deep_feed):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    settings.BLOG_PAGINATOR_COUNT_LIMIT = N_PER_PAGE
+    user_client.get("/?page=1")
+    deep_feed[0].save()
+    _, counts = _count_queries(user_client, "/?page=1")
+    assert not counts, (
+        "Убедитесь, что оценка «больше порога» не пересчитывается после "
+        "каждой правки поста."
+    )
@@ -0,0 +1,83 @@
+from unittest import mock
+
+import pytest
+from blog.models import Comment
+from blog.templatetags import blog_fragments
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def without_page_cache(settings):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+
+
+@pytest.fixture
+def rendered_cards():
+    with mock.patch.object(
+            blog_fragments, "render_to_string",
+            wraps=blog_fragments.render_to_string) as render:
+        yield render
+
+
+def test_card_rendered_once_for_all_pages_and_users(
+        user_client, another_user_client, user, rendered_cards,
+        post_with_published_location):
+    post = post_with_published_location
+    user_client.get("/")
+    assert rendered_cards.call_count == 1
+
+    another_user_client.get("/")
+    user_client.get(f"/category/{post.category.slug}/")
+    user_client.get(f"/profile/{post.author.username}/")
+    assert rendered_cards.call_count == 1, (
+        "Убедитесь, что карточка поста рендерится один раз и затем "
+        "берётся из кэша на всех страницах и для всех посетителей."
+    )
+
+
+def _add_comment(post):
+    Comment.objects.create(post=post, author=post.author, text="Комментарий")
+
+
+def _edit_post(post):
+    post.title = "Новый заголовок"
+    post.save()
+
+
+def _edit_category(post):
+    post.category.title = "Новая категория"
+    post.category.save()
+
+
+def _edit_location(post):
+    post.location.name = "Новое место"
+    post.location.save()
+
+
+def _edit_author(post):
+    post.author.username = "renamed"
+    post.author.save()
+
+
+@pytest.mark.parametrize("change, expected", [
+    (_add_comment, "Комментарии (1)"),
+    (_edit_post, "Новый заголовок"),
+    (_edit_category, "Новая категория"),
+    (_edit_location, "Новое место"),
+    (_edit_author, "@renamed"),
+])
+def test_card_rerendered_after_change(
+        user_client, post_with_published_location, change, expected):
+    post = post_with_published_location
+    assert expected not in user_client.get("/").content.decode()
+    change(post)
+    assert expected in user_client.get("/").content.decode()
+
+
+def test_card_cache_can_be_disabled(
+        settings, user_client, rendered_cards, post_with_published_location):
+    settings.BLOG_POST_CARD_CACHE_TIMEOUT = 0
+    user_client.get("/")
+    user_client.get("/")
+    assert rendered_cards.call_count == 2
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+import pytest
+from blog.utils import published_now
+from django.test import override_settings
+from django.utils import timezone
+
+
+@override_settings(BLOG_PUBLISHED_NOW_BUCKET=30)
+def test_published_now_is_quantized():
+    before = timezone.now()
+    value = published_now()
+    assert value.timestamp() % 30 == 0, (
+        "Убедитесь, что `published_now()` округляет время до шага корзины."
+    )
+    assert before <= value < before + timedelta(seconds=30), (
+        "Убедитесь, что отложенные публикации появляются не раньше, чем за"
+        " одну корзину до своего времени."
+    )
+
+
+@override_settings(BLOG_PUBLISHED_NOW_BUCKET=0)
+def test_published_now_without_bucket():
+    before = timezone.now()
+    assert before <= published_now() <= timezone.now()
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_PUBLISHED_NOW_BUCKET=30)
+def test_scheduled_post_hidden_beyond_bucket(
+        mixer, user_client, published_category):
+    mixer.blend(
+        "blog.Post", category=published_category,
+        pub_date=timezone.now() + timedelta(minutes=1))
+    assert len(user_client.get("/").context["page_obj"]) == 0
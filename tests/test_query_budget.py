@@ -0,0 +1,98 @@
+"""Бюджеты SQL-запросов и времени ответа для всех адресов `blog/urls.py`.
+
+Бюджеты хранятся в `query_budgets.json` рядом с этим файлом. Если
+страница стала делать больше запросов, тест упадёт; если меньше —
+бюджет стоит уменьшить в том же коммите. Новый адрес без бюджета
+тоже считается ошибкой.
+"""
+import json
+import time
+from pathlib import Path
+
+import pytest
+from blog.models import Comment
+from blog.urls import app_name, urlpatterns
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import urlencode
+
+pytestmark = [pytest.mark.django_db]
+
+BUDGETS_PATH = Path(__file__).parent / "query_budgets.json"
+BUDGETS = json.loads(BUDGETS_PATH.read_text(encoding="utf-8"))
+COMMENTS_ON_POST = 120
+SEARCH_WORD = "бюджет"
+QUERY_STRINGS = {"search": {"q": SEARCH_WORD}}
+
+
+@pytest.fixture
+def realistic_data(
+        mixer, user, many_posts_with_published_locations,
+        post_with_published_location, post_with_another_category):
+    post = post_with_published_location
+    mixer.cycle(COMMENTS_ON_POST).blend(Comment, post=post)
+    own_comment = mixer.blend(Comment, post=post, author=user)
+    post.title = f"{SEARCH_WORD} {post.title}"
+    post.save()
+    return {
+        "index": {},
+        "category_posts": {"category_slug": post.category.slug},
+        "edit_profile": {},
+        "profile": {"username": user.username},
+        "create_post": {},
+        "edit_post": {"pk": post.id},
+        "post_detail": {"id": post.id},
+        "delete_post": {"id": post.id},
+        "add_comment": {"post_id": post.id},
+        "edit_comment": {"post_id": post.id, "id": own_comment.id},
+        "delete_comment": {"post_id": post.id, "id": own_comment.id},
+        "search": {},
+        "index_feed": {},
+        "index_atom_feed": {},
+        "category_feed": {"category_slug": post.category.slug},
+        "category_atom_feed": {"category_slug": post.category.slug},
+        "profile_feed": {"username": user.username},
+        "profile_atom_feed": {"username": user.username},
+        "sitemap": {},
+        "sitemap_section": {"section": "posts"},
+    }
+
+
+def test_every_route_has_budget():
+    routes = {f"{app_name}:{pattern.name}" for pattern in urlpatterns}
+    assert routes == set(BUDGETS["routes"]), (
+        f"Добавьте или удалите бюджеты в `{BUDGETS_PATH.name}` так, чтобы"
+        " они соответствовали адресам `blog/urls.py`."
+    )
+
+
+@pytest.mark.parametrize("route", sorted(BUDGETS["routes"]))
+def test_route_within_budget(user_client, realistic_data, route):
+    budget = BUDGETS["routes"][route]
+    name = route.split(":")[1]
+    url = reverse(route, kwargs=realistic_data[name])
+    if name in QUERY_STRINGS:
+        url += "?" + urlencode(QUERY_STRINGS[name])
+
+    with CaptureQueriesContext(connection) as ctx:
+        started = time.perf_counter()
+        response = user_client.get(url)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+    assert response.status_code == 200, (
+        f"Страница `{url}` ({route}) ответила кодом {response.status_code}:"
+        " бюджет должен измерять саму страницу."
+    )
+    queries = len(ctx.captured_queries)
+    assert queries <= budget["queries"], (
+        f"Страница `{url}` ({route}) делает {queries} SQL-запросов при"
+        f" бюджете {budget['queries']}:\n"
+        + "\n".join(query["sql"] for query in ctx.captured_queries)
+    )
+    assert elapsed_ms <= budget["ms"], (
+        f"Страница `{url}` ({route}) отвечала {elapsed_ms:.0f} мс при"
+        f" бюджете {budget['ms']} мс."
+    )
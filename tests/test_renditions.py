@@ -0,0 +1,116 @@
+from io import BytesIO
+
+import pytest
+from blog.models import Post
+from blog.renditions import rendition_files
+from blog.tasks import build_post_renditions
+from django.core.files.base import ContentFile
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import override_settings
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _image_file(width, height, name="wide.jpg"):
+    img = Image.new("RGB", (width, height), color=(73, 109, 137))
+    buffer = BytesIO()
+    img.save(buffer, format="JPEG")
+    return ImageFile(buffer, name=name)
+
+
+@override_settings(BLOG_IMAGE_RENDITION_WIDTHS=(40, 80, 4000))
+def test_renditions_built_on_upload(
+        mixer, user, published_category, user_client):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=_image_file(120, 60))
+    renditions = Post.objects.get(pk=post.pk).image_renditions
+
+    assert renditions["source"] == post.image.name
+    assert [width for width, _ in renditions["webp"]] == [40, 80, 120]
+    assert [width for width, _ in renditions["fallback"]] == [40, 80], (
+        "Убедитесь, что копии не увеличивают исходное изображение."
+    )
+
+    content = user_client.get("/").content.decode("utf-8")
+    assert 'type="image/webp"' in content
+    assert "40w" in content and content.count("<picture>") == 1, (
+        "Убедитесь, что в ленте выводится одно изображение со `srcset`."
+    )
+
+
+@override_settings(BLOG_IMAGE_RENDITION_WIDTHS=(40,))
+def test_renditions_job_refreshes_cached_pages(
+        mixer, user, published_category, user_client):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=_image_file(120, 60))
+    Post.objects.filter(pk=post.pk).update(image_renditions={})
+    urls = ["/", f"/category/{published_category.slug}/", f"/posts/{post.pk}/"]
+    for url in urls:
+        assert 'type="image/webp"' not in user_client.get(url).content.decode()
+
+    build_post_renditions(post.pk)
+
+    for url in urls:
+        content = user_client.get(url).content.decode()
+        assert 'type="image/webp"' in content, (
+            f"Убедитесь, что после построения копий изображения страница"
+            f" `{url}` не отдаётся из кэша в прежнем виде."
+        )
+
+
+@override_settings(BLOG_IMAGE_RENDITION_WIDTHS=(50,))
+def test_command_builds_missing_renditions(post_with_published_location):
+    Post.objects.update(image_renditions={})
+
+    call_command("generate_renditions", "--workers", "2")
+
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    assert [width for width, _ in post.image_renditions["webp"]] == [50, 100]
+
+
+@override_settings(BLOG_IMAGE_RENDITION_WIDTHS=(40,))
+def test_replaced_and_deleted_renditions_removed_from_storage(
+        mixer, user, published_category, django_capture_on_commit_callbacks):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=_image_file(120, 60, name="first.jpg"))
+    old_files = rendition_files(
+        Post.objects.get(pk=post.pk).image_renditions)
+    assert old_files and all(map(default_storage.exists, old_files))
+
+    post = Post.objects.get(pk=post.pk)
+    post.image = _image_file(100, 50, name="second.jpg")
+    post.save()
+    new_files = rendition_files(
+        Post.objects.get(pk=post.pk).image_renditions)
+    assert all(map(default_storage.exists, new_files))
+    assert not any(map(default_storage.exists, old_files)), (
+        "Убедитесь, что копии прежнего изображения удаляются."
+    )
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Post.objects.get(pk=post.pk).delete()
+    assert not any(map(default_storage.exists, new_files)), (
+        "Убедитесь, что копии изображения удаляются вместе с постом."
+    )
+
+
+@override_settings(BLOG_IMAGE_RENDITION_WIDTHS=(50,))
+def test_command_removes_outdated_renditions(post_with_published_location):
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    outdated = default_storage.save(
+        "renditions/outdated-50w.webp", ContentFile(b"webp"))
+    Post.objects.filter(pk=post.pk).update(image_renditions={
+        "source": "outdated.jpg", "width": 50, "fallback": [],
+        "webp": [[50, outdated]]})
+
+    call_command("generate_renditions", "--workers", "1")
+
+    assert not default_storage.exists(outdated)
+    assert all(map(default_storage.exists, rendition_files(
+        Post.objects.get(pk=post.pk).image_renditions)))
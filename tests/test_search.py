@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+import pytest
+from blog.models import Post, SearchEntry
+from blog.search import get_search_backend, tokenize
+from blog.stemming import stem
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(params=["fts5", "inverted"])
+def search_backend(request, settings):
+    settings.BLOG_SEARCH_BACKEND = request.param
+    return request.param
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category, search_backend):
+    def make(title, text="", **kwargs):
+        kwargs.setdefault("category", published_category)
+        kwargs.setdefault("is_published", True)
+        return mixer.blend(
+            "blog.Post", author=user, title=title, text=text,
+            pub_date=timezone.now() - timedelta(days=1), **kwargs)
+    return make
+
+
+def _found(client, query, page=1):
+    response = client.get("/search/", {"q": query, "page": page})
+    assert response.status_code == 200
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_tokenize():
+    assert tokenize("Hello, World! hello_world 42") == [
+        "hello", "world", "hello_world", "42"]
+    assert tokenize("Лесные реки") == tokenize("лесная река")
+
+
+def test_finds_all_words_ranked_by_title(client, make_post):
+    in_text = make_post("Прогулка", "Утренний ЛЕС и река")
+    in_title = make_post("Лес у реки", "Утренний туман")
+    make_post("Река", "Без нужного слова")
+
+    assert _found(client, "лес") == [in_title.id, in_text.id], (
+        "Совпадение в заголовке должно ранжироваться выше, чем в тексте."
+    )
+    assert _found(client, "утренний лес") == [in_title.id, in_text.id]
+    assert _found(client, "лес туман") == [in_title.id]
+    assert _found(client, "лесами рекой") == [in_title.id, in_text.id], (
+        "Поиск должен находить другие формы тех же слов."
+    )
+    assert _found(client, "горы") == []
+    assert _found(client, "   ") == []
+
+
+def test_same_visibility_as_feed(client, mixer, make_post):
+    unpublished_category = mixer.blend("blog.Category", is_published=False)
+    visible = make_post("Маяк на скале")
+    make_post("Маяк черновик", is_published=False)
+    make_post("Маяк в скрытой категории", category=unpublished_category)
+    future = make_post("Маяк в будущем")
+    Post.objects.filter(pk=future.pk).update(
+        pub_date=timezone.now() + timedelta(days=1))
+
+    assert _found(client, "маяк") == [visible.id]
+
+
+def test_index_follows_edits_and_deletes(client, make_post):
+    post = make_post("Старое название", "текст")
+    assert _found(client, "старое") == [post.id]
+
+    post.title = "Новое название"
+    post.save()
+    assert _found(client, "старое") == []
+    assert _found(client, "новое") == [post.id]
+
+    post.delete()
+    assert _found(client, "новое") == []
+
+
+def test_pagination_keeps_query(client, make_post):
+    posts = [make_post(f"Кот номер {i}") for i in range(12)]
+    first, second = _found(client, "кот"), _found(client, "кот", page=2)
+
+    assert len(first) == 10 and len(second) == 2
+    assert set(first + second) == {post.id for post in posts}
+    content = client.get("/search/", {"q": "кот"}).content.decode()
+    assert "?q=%D0%BA%D0%BE%D1%82&amp;page=2" in content
+
+
+def test_rebuild_command(client, make_post, search_backend):
+    posts = [make_post(f"Сова {i}") for i in range(5)]
+    get_search_backend().clear()
+    assert _found(client, "сова") == []
+
+    call_command("rebuild_search_index", "--batch-size", "2")
+    assert sorted(_found(client, "сова")) == sorted(p.id for p in posts)
+    if search_backend == "inverted":
+        assert SearchEntry.objects.filter(
+            term=stem("сова")).count() == 5
+
+
+@pytest.mark.parametrize("search_backend", ["inverted"], indirect=True)
+def test_inverted_index_caches_post_total(
+        django_assert_num_queries, make_post):
+    make_post("Сова")
+    backend = get_search_backend()
+    terms = tokenize("сова")
+    backend.search(Post.objects.all(), terms)
+    # Только частоты термов: число постов для IDF берётся из кэша.
+    with django_assert_num_queries(1):
+        backend.search(Post.objects.all(), terms)
+
+    make_post("Вторая сова")
+    with django_assert_num_queries(2):
+        backend.search(Post.objects.all(), terms)
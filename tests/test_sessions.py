@@ -0,0 +1,32 @@
+import pytest
+from django.conf import settings as django_settings
+from django.test.client import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(("store", "queries"), [
+    # сессия + пользователь
+    ("db", 2),
+    # сессия из кэша, из базы только пользователь
+    ("cached_db", 1),
+    ("signed_cookies", 1),
+])
+def test_session_stores_serve_authenticated_pages(
+        django_assert_num_queries, settings, user,
+        post_with_published_location, store, queries):
+    settings.SESSION_ENGINE = django_settings.SESSION_ENGINES[store]
+    client = Client()
+    client.force_login(user)
+    url = f"/posts/{post_with_published_location.id}/"
+    client.get(url)
+
+    with django_assert_num_queries(queries):
+        response = client.get(url)
+    assert response.status_code == 200
+    assert user.username in response.content.decode()
+
+    client.get("/auth/logout/")
+    assert client.get(url).status_code == 302, (
+        "Убедитесь, что после выхода страница поста снова требует входа."
+    )
@@ -0,0 +1,108 @@
+import runpy
+
+import pytest
+from blogicum import settings as settings_module
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+SHARED_CACHE = {
+    "BLOGICUM_CACHE_BACKEND":
+        "django.core.cache.backends.filebased.FileBasedCache",
+    "BLOGICUM_CACHE_LOCATION": "/tmp/blogicum-cache",
+}
+
+
+def load_settings(monkeypatch, profile, **env):
+    """Свежая копия settings.py с профилем из окружения."""
+    monkeypatch.setenv("BLOGICUM_PROFILE", profile)
+    if profile == "prod":
+        env = {**SHARED_CACHE, **env}
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(settings_module.__file__)
+
+
+def test_pytest_uses_test_profile():
+    assert settings.PROFILE == "test", (
+        "Убедитесь, что тесты запускаются с профилем настроек test."
+    )
+    assert "debug_toolbar" not in settings.INSTALLED_APPS
+
+
+def test_dev_profile_has_debug_toolbar(monkeypatch):
+    monkeypatch.delenv("BLOGICUM_JOB_QUEUE_MODE", raising=False)
+    config = load_settings(monkeypatch, "dev")
+    assert config["DEBUG"]
+    assert config["JOB_QUEUE_MODE"] == "immediate", (
+        "Без запущенного воркера задачи в dev должны выполняться сразу."
+    )
+    assert "debug_toolbar" in config["INSTALLED_APPS"]
+    middleware = config["MIDDLEWARE"]
+    assert middleware.index(
+        "debug_toolbar.middleware.DebugToolbarMiddleware"
+    ) == middleware.index("django.middleware.common.CommonMiddleware") + 1
+
+
+@pytest.mark.parametrize("profile", ["test", "prod"])
+def test_profile_without_debug_toolbar(monkeypatch, profile):
+    config = load_settings(
+        monkeypatch, profile, BLOGICUM_SECRET_KEY="secret")
+    assert not config["DEBUG"]
+    assert "debug_toolbar" not in config["INSTALLED_APPS"]
+    assert not any(
+        "debug_toolbar" in name for name in config["MIDDLEWARE"])
+
+
+def test_prod_profile(monkeypatch):
+    monkeypatch.delenv("BLOGICUM_JOB_QUEUE_MODE", raising=False)
+    config = load_settings(
+        monkeypatch, "prod", BLOGICUM_SECRET_KEY="secret",
+        BLOGICUM_ALLOWED_HOSTS="blogicum.example,www.blogicum.example")
+    assert config["SECRET_KEY"] == "secret"
+    assert config["ALLOWED_HOSTS"] == [
+        "blogicum.example", "www.blogicum.example"]
+    templates = config["TEMPLATES"][0]
+    assert not templates["APP_DIRS"]
+    (loader, _), = templates["OPTIONS"]["loaders"]
+    assert loader == "django.template.loaders.cached.Loader"
+    assert config["STATICFILES_STORAGE"].endswith(
+        "ManifestStaticFilesStorage")
+    assert config["DATABASES"]["default"]["CONN_MAX_AGE"] > 0
+    assert config["JOB_QUEUE_MODE"] == "database"
+
+
+def test_sessions_cached_only_in_shared_cache(monkeypatch, tmp_path):
+    monkeypatch.delenv("BLOGICUM_SESSION_STORE", raising=False)
+    monkeypatch.delenv("BLOGICUM_SESSION_CACHE_DIR", raising=False)
+    config = load_settings(monkeypatch, "dev")
+    assert config["SESSION_ENGINE"] == "django.contrib.sessions.backends.db"
+
+    config = load_settings(
+        monkeypatch, "dev", BLOGICUM_SESSION_CACHE_DIR=str(tmp_path))
+    assert config["SESSION_ENGINE"] == (
+        "django.contrib.sessions.backends.cached_db")
+
+
+def test_prod_requires_shared_caches(monkeypatch):
+    monkeypatch.delenv("BLOGICUM_SESSION_CACHE_DIR", raising=False)
+    with pytest.raises(ImproperlyConfigured):
+        load_settings(
+            monkeypatch, "prod", BLOGICUM_SECRET_KEY="secret",
+            BLOGICUM_CACHE_BACKEND="")
+    config = load_settings(
+        monkeypatch, "prod", BLOGICUM_SECRET_KEY="secret")
+    for cache in config["CACHES"].values():
+        assert cache["BACKEND"] == SHARED_CACHE["BLOGICUM_CACHE_BACKEND"]
+    assert config["CACHES"]["default"]["KEY_PREFIX"] != (
+        config["CACHES"]["sessions"]["KEY_PREFIX"])
+
+
+def test_prod_profile_requires_secret_key(monkeypatch):
+    monkeypatch.delenv("BLOGICUM_SECRET_KEY", raising=False)
+    with pytest.raises(ImproperlyConfigured):
+        load_settings(monkeypatch, "prod")
+
+
+def test_unknown_profile(monkeypatch):
+    with pytest.raises(ImproperlyConfigured):
+        load_settings(monkeypatch, "staging")
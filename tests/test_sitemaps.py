@@ -0,0 +1,121 @@
+from xml.etree import ElementTree
+
+import pytest
+from blog.models import Post
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+SITEMAP = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+CHUNK_SIZE = 3
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(settings):
+    settings.BLOG_SITEMAP_CHUNK_SIZE = CHUNK_SIZE
+
+
+@pytest.fixture
+def sitemap_posts(mixer, user, published_category):
+    posts = mixer.cycle(7).blend(
+        Post, author=user, category=published_category, is_published=True)
+    hidden = posts[4]
+    hidden.is_published = False
+    hidden.save()
+    return posts
+
+
+def _locations(response):
+    assert response.status_code == 200
+    root = ElementTree.fromstring(response.content)
+    return [loc.text for loc in root.iter(f"{SITEMAP}loc")]
+
+
+def _post_chunk(client, page):
+    return _locations(client.get(f"/sitemap-posts.xml?p={page}"))
+
+
+def test_index_lists_chunks_of_every_section(client, sitemap_posts):
+    locations = _locations(client.get("/sitemap.xml"))
+    last_pk = sitemap_posts[-1].pk
+    post_chunks = -(-last_pk // CHUNK_SIZE)
+    assert locations[:post_chunks] == [
+        "http://testserver/sitemap-posts.xml",
+        *(f"http://testserver/sitemap-posts.xml?p={page}"
+          for page in range(2, post_chunks + 1)),
+    ]
+    assert "http://testserver/sitemap-categories.xml" in locations
+    assert "http://testserver/sitemap-profiles.xml" in locations
+
+
+def test_chunks_split_posts_by_id_range(client, sitemap_posts):
+    visible = [post for post in sitemap_posts if post.is_published]
+    pages = range(1, -(-sitemap_posts[-1].pk // CHUNK_SIZE) + 1)
+    found = [location for page in pages
+             for location in _post_chunk(client, page)]
+    assert found == [
+        f"http://testserver/posts/{post.pk}/" for post in visible]
+    for page in pages:
+        ids = [int(location.rstrip("/").rsplit("/", 1)[1])
+               for location in _post_chunk(client, page)]
+        assert all((page - 1) * CHUNK_SIZE < pk <= page * CHUNK_SIZE
+                   for pk in ids)
+
+
+def test_chunk_reads_posts_without_offset(client, sitemap_posts):
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/sitemap-posts.xml?p=2")
+    assert not any("OFFSET" in query["sql"] for query in ctx.captured_queries)
+
+
+def test_unknown_section_and_page_404(client, sitemap_posts):
+    assert client.get("/sitemap-comments.xml").status_code == 404
+    assert client.get("/sitemap-posts.xml?p=100").status_code == 404
+    assert client.get("/sitemap-posts.xml?p=abc").status_code == 404
+
+
+def test_post_change_invalidates_only_its_chunk(
+        client, django_assert_num_queries, sitemap_posts):
+    first, last = sitemap_posts[0], sitemap_posts[-1]
+    first_page = (first.pk - 1) // CHUNK_SIZE + 1
+    last_page = (last.pk - 1) // CHUNK_SIZE + 1
+    assert first_page != last_page
+    _post_chunk(client, first_page)
+    _post_chunk(client, last_page)
+
+    last.is_published = False
+    last.save()
+
+    with django_assert_num_queries(0):
+        cached = client.get(f"/sitemap-posts.xml?p={first_page}")
+    assert cached["X-Page-Cache"] == "hit"
+    assert f"http://testserver/posts/{last.pk}/" not in _post_chunk(
+        client, last_page)
+
+
+def test_sitemap_answers_conditional_get(client, sitemap_posts):
+    response = client.get("/sitemap-posts.xml")
+    assert response["X-Robots-Tag"]
+    repeat = client.get(
+        "/sitemap-posts.xml", HTTP_IF_NONE_MATCH=response["ETag"])
+    assert repeat.status_code == 304
+
+
+def test_new_user_appears_in_profiles(client, mixer, sitemap_posts):
+    client.get("/sitemap-profiles.xml")
+    newcomer = mixer.blend("auth.User", is_active=True)
+    locations = _locations(client.get("/sitemap-profiles.xml?p=1"))
+    assert f"http://testserver/profile/{newcomer.username}/" in locations
+
+
+def test_cached_sitemap_keeps_request_host_and_scheme(client, sitemap_posts):
+    post = sitemap_posts[0]
+    for host in ("localhost", "127.0.0.1"):
+        assert f"http://{host}/posts/{post.pk}/" in _locations(
+            client.get("/sitemap-posts.xml", HTTP_HOST=host))
+    assert f"https://localhost/posts/{post.pk}/" in _locations(client.get(
+        "/sitemap-posts.xml", HTTP_HOST="localhost", secure=True))
+    cached = client.get("/sitemap-posts.xml", HTTP_HOST="127.0.0.1")
+    assert cached["X-Page-Cache"] == "hit"
+    assert f"http://127.0.0.1/posts/{post.pk}/" in _locations(cached)
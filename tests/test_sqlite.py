@@ -0,0 +1,43 @@
+import pytest
+from django.db import connections
+
+pytestmark = [pytest.mark.django_db]
+
+TUNED = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": 5000,
+}
+
+
+@pytest.fixture
+def file_connection(settings, tmp_path):
+    settings.SQLITE_PRAGMAS = TUNED
+    default = connections["default"]
+    wrapper = type(default)(
+        {**default.settings_dict, "NAME": str(tmp_path / "db.sqlite3")},
+        alias="pragmas",
+    )
+    yield wrapper
+    wrapper.close()
+
+
+def _pragma(db_connection, name):
+    with db_connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_pragmas_applied_on_connect(file_connection):
+    assert _pragma(file_connection, "journal_mode") == "wal", (
+        "Убедитесь, что новое соединение с SQLite переводит базу в режим WAL."
+    )
+    assert _pragma(file_connection, "synchronous") == 1
+    assert _pragma(file_connection, "busy_timeout") == 5000
+
+
+def test_default_profile_restores_rollback_journal(settings, file_connection):
+    _pragma(file_connection, "journal_mode")
+    file_connection.close()
+    settings.SQLITE_PRAGMAS = settings.SQLITE_PROFILES["default"]
+    assert _pragma(file_connection, "journal_mode") == "delete"
@@ -0,0 +1,57 @@
+import json
+import re
+from pathlib import Path
+
+import pytest
+from blog.search import tokenize
+from blog.stemming import normalize, stem
+
+FIXTURE = Path(__file__).resolve().parent.parent / "db.json"
+
+
+@pytest.mark.parametrize("forms", [
+    ("лес", "леса", "лесу", "лесом", "лесах"),
+    ("река", "реки", "реке", "рекой", "реку"),
+    ("красивый", "красивая", "красивого", "красивыми"),
+    ("читать", "читаю", "читает", "читали"),
+    ("осторожность", "осторожности"),
+])
+def test_word_forms_share_stem(forms):
+    stems = {stem(normalize(form)) for form in forms}
+    assert len(stems) == 1, (
+        f"Формы {forms} должны сводиться к одной основе, а дали {stems}."
+    )
+
+
+def test_normalization():
+    assert normalize("ЁЛКА Ёжик") == "елка ежик"
+    assert tokenize("Ёлки") == tokenize("елки") == tokenize("ЕЛКИ")
+    assert tokenize("Python 3 django_app") == ["python", "3", "django_app"]
+
+
+def test_stem_is_memoized():
+    stem.cache_clear()
+    stem("прогулками")
+    stem("прогулками")
+    assert stem.cache_info().hits == 1
+
+
+def test_matches_reference_snowball_stemmer():
+    snowballstemmer = pytest.importorskip("snowballstemmer")
+    reference = snowballstemmer.stemmer("russian")
+    posts = [
+        record["fields"]
+        for record in json.loads(FIXTURE.read_text(encoding="utf-8"))
+        if record["model"] == "blog.post"
+    ]
+    words = {
+        word
+        for post in posts
+        for word in re.findall(
+            "[а-я]+", normalize(post["title"] + " " + post["text"]))
+    }
+    mismatched = {
+        word: (stem(word), reference.stemWord(word))
+        for word in words if stem(word) != reference.stemWord(word)
+    }
+    assert not mismatched
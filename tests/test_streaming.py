@@ -0,0 +1,65 @@
+import pytest
+from blog.models import Post
+from blog.streaming import iterate_rows
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def streaming_pages(settings):
+    settings.BLOG_STREAMING_PAGES = True
+
+
+def _chunks(response):
+    assert response.streaming, (
+        "Убедитесь, что при BLOG_STREAMING_PAGES страница отдаётся потоком."
+    )
+    return [chunk.decode() for chunk in response.streaming_content]
+
+
+def test_detail_streams_comments_after_post(
+        mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend(
+        "blog.Comment", post=post, author=post.author, is_published=True,
+        text=(f"Комментарий {i}" for i in range(3)))
+    chunks = _chunks(user_client.get(f"/posts/{post.id}/"))
+
+    assert post.title in chunks[0]
+    assert "Комментарий" not in chunks[0], (
+        "Убедитесь, что шапка и текст поста уходят до комментариев."
+    )
+    page = "".join(chunks)
+    positions = [page.index(f"Комментарий {i}") for i in range(3)]
+    assert positions == sorted(positions)
+    assert "</html>" in chunks[-1]
+    assert "blog:hole" not in page and "blog:stream" not in page
+    assert f"/posts/{post.id}/edit/" in page
+    assert "csrfmiddlewaretoken" in page
+
+
+def test_streamed_page_is_cached_after_full_read(
+        unlogged_client, user_client, user, post_with_published_location):
+    page = "".join(_chunks(unlogged_client.get("/")))
+    assert post_with_published_location.title in page
+
+    response = user_client.get("/")
+    assert response["X-Page-Cache"] == "hit", (
+        "Убедитесь, что отданная потоком страница попадает в общий кэш."
+    )
+    content = response.content.decode()
+    assert post_with_published_location.title in content
+    assert user.username in content
+
+
+def test_stream_empty_branch(user_client, post_with_published_location):
+    page = "".join(_chunks(user_client.get("/search/?q=нетакогослова")))
+    assert "ничего не найдено" in page
+
+
+def test_unevaluated_queryset_read_with_cursor(post_with_published_location):
+    rows = iterate_rows(Post.objects.all())
+    assert not isinstance(rows, type(iter([]))), (
+        "Убедитесь, что невычисленный QuerySet читается через iterator()."
+    )
+    assert [post.pk for post in rows] == [post_with_published_location.pk]
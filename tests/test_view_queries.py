@@ -0,0 +1,41 @@
+import pytest
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+# Сессия по умолчанию хранится в базе (SESSION_ENGINE = db), поэтому
+# каждый запрос авторизованного пользователя читает сессию и пользователя.
+AUTH_QUERIES = 2
+
+
+@pytest.fixture
+def own_comment(mixer, user, post_with_published_location):
+    return mixer.blend(
+        Comment, post=post_with_published_location, author=user)
+
+
+@pytest.mark.parametrize(("url_template", "own", "expected"), [
+    # пост + списки местоположений и категорий в форме
+    ("/posts/{post.id}/edit/", True, 3),
+    # только пост: чужой автор отправляется на страницу поста
+    ("/posts/{post.id}/edit/", False, 1),
+    ("/posts/{post.id}/delete/", True, 1),
+    ("/posts/{post.id}/edit_comment/{comment.id}/", True, 1),
+    ("/posts/{post.id}/delete_comment/{comment.id}/", True, 1),
+    ("/posts/{post.id}/delete_comment/{comment.id}/", False, 1),
+    # пользователь + версии страницы + COUNT + страница постов
+    ("/profile/{post.author.username}/", True, 4),
+    # категория + версии страницы + COUNT + страница постов + ближайшая
+    # отложенная публикация для срока кэша
+    ("/category/{post.category.slug}/", True, 5),
+])
+def test_object_looked_up_once(
+        django_assert_num_queries, user_client, another_user_client,
+        post_with_published_location, own_comment, url_template, own,
+        expected):
+    url = url_template.format(
+        post=post_with_published_location, comment=own_comment)
+    client = user_client if own else another_user_client
+    with django_assert_num_queries(AUTH_QUERIES + expected):
+        response = client.get(url)
+    assert response.status_code in (200, 302, 403)